@@ -1,18 +1,49 @@
-from flask import Flask
+import hmac
+from flask import Flask, request
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from app.config import Config
 from app.utils.database import Database
+from app.utils.metrics import Metrics
+from app.services.message_pipeline import MessagePipeline
+from app.services.receipt_service import ReceiptService
+from app.services.schedule_service import ScheduleService
+from app.services.presence_service import PresenceService
+from app.services.presence_fanout import PresenceFanout
+from app.repositories.user_search_index import UserSearchIndex
+from app.repositories.contact_graph import ContactGraph
+from app.services.suggestion_service import SuggestionService
 
 from app.controllers.auth_controller import auth_bp
 from app.controllers.contact_controller import contact_bp
 from app.controllers.message_controller import message_bp
 from app.controllers.push_controller import push_bp
+from app.controllers.presence_controller import presence_bp
+from app.controllers.bootstrap_controller import bootstrap_bp
+from app.controllers.batch_controller import batch_bp
 
 from app.sockets import register_socket_events
 
 socketio = SocketIO()
 
+def register_commands(app):
+    @app.cli.command('compute-suggestions')
+    def compute_suggestions():
+        """Recalcula "pessoas que você talvez conheça" (rodar via cron)"""
+        total = SuggestionService.compute()
+        print(f"🤝 {total} sugestões de contato gravadas")
+
+def create_cli_app():
+    """
+    App mínimo para os comandos `flask` (cron, manutenção)
+
+    Sem Socket.IO nem serviços em segundo plano (agendador, recibos,
+    presença, grafo de contatos, índice de busca): o comando só usa o banco.
+    """
+    app = Flask(__name__)
+    register_commands(app)
+    return app
+
 def create_app():
     app = Flask(__name__)
 
@@ -25,13 +56,21 @@ def create_app():
         supports_credentials=True
     )
 
+    socketio_options = {}
+    if Config.SOCKETIO_MESSAGE_QUEUE:
+        # Emits passam pelo broker e chegam aos clientes de qualquer worker
+        socketio_options['message_queue'] = Config.SOCKETIO_MESSAGE_QUEUE
+    if Config.SOCKETIO_WEBSOCKET_ONLY:
+        socketio_options['transports'] = ['websocket']
+
     socketio.init_app(app,
         cors_allowed_origins="*",
         async_mode='eventlet',
         logger=True,
         engineio_logger=True,
         ping_timeout=60,
-        ping_interval=25
+        ping_interval=25,
+        **socketio_options
     )
 
     @app.after_request
@@ -45,8 +84,18 @@ def create_app():
     app.register_blueprint(contact_bp)
     app.register_blueprint(message_bp)
     app.register_blueprint(push_bp)
+    app.register_blueprint(presence_bp)
+    app.register_blueprint(bootstrap_bp)
+    app.register_blueprint(batch_bp)
 
     register_socket_events(socketio)
+    MessagePipeline.init_app(socketio)
+    ReceiptService.start()
+    ScheduleService.init_app(socketio)
+    PresenceService.init_app(socketio)
+    PresenceFanout.init_app(socketio)
+    UserSearchIndex.init_app()
+    ContactGraph.init_app()
 
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -64,6 +113,17 @@ def create_app():
                 'message': 'API is not running perfectly'
             }, 503
     
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        # Dados internos: só com o token de métricas (fora disso, a rota "não existe")
+        auth_header = request.headers.get('Authorization', '')
+        token = auth_header[7:] if auth_header.lower().startswith('bearer ') else ''
+        if not Config.METRICS_TOKEN or not hmac.compare_digest(token, Config.METRICS_TOKEN):
+            return {'message': 'Not found'}, 404
+        return Metrics.snapshot(), 200
+
+    register_commands(app)
+
     @app.route('/', methods=['GET'])
     def index():
         return {
@@ -73,7 +133,10 @@ def create_app():
             'endpoints': {
                 'auth': '/api/auth',
                 'contacts': '/api/contacts',
-                'messages': '/api/messages'
+                'messages': '/api/messages',
+                'presence': '/api/presence',
+                'bootstrap': '/api/bootstrap',
+                'batch': '/api/batch'
             }
         }, 200
     
@@ -21,6 +21,17 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev_secret_key')
     JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
     JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', 24))
+    # Tokens já verificados ficam em cache (pelo digest) por até isso
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 50000))
+    AUTH_TOKEN_CACHE_TTL_SECONDS = int(os.getenv('AUTH_TOKEN_CACHE_TTL_SECONDS', 300))
+
+    # /metrics: exige `Authorization: Bearer <METRICS_TOKEN>`; sem token configurado, fica desativado
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # bcrypt: custo dos novos hashes (hashes antigos são regravados no login)
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    # Hashes/verificações simultâneos por worker (cada um ocupa um núcleo)
+    BCRYPT_MAX_CONCURRENCY = int(os.getenv('BCRYPT_MAX_CONCURRENCY', 2))
     
     # Flask
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
@@ -63,8 +74,100 @@ class Config:
     else:
         print("⚠️ VAPID_PRIVATE_KEY não definida!")
     
+    # Socket.IO multi-worker / multi-nó
+    # Broker (Redis ou compatível) que repassa emits entre processos
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    # Estado compartilhado (sessões, presença); padrão: o mesmo broker
+    SHARED_STORE_URL = os.getenv('SHARED_STORE_URL', SOCKETIO_MESSAGE_QUEUE)
+    # Só WebSocket: dispensa sticky sessions (o polling exige afinidade)
+    SOCKETIO_WEBSOCKET_ONLY = os.getenv('SOCKETIO_WEBSOCKET_ONLY', 'False') == 'True'
+
+    # Presença: sessão sem heartbeat por mais que isso é considerada morta
+    PRESENCE_TTL = int(os.getenv('PRESENCE_TTL', 90))
+    # Janela de agregação dos presence_diff enviados aos contatos
+    PRESENCE_FANOUT_INTERVAL = float(os.getenv('PRESENCE_FANOUT_INTERVAL', 1.0))
+    PRESENCE_SNAPSHOT_MAX_IDS = int(os.getenv('PRESENCE_SNAPSHOT_MAX_IDS', 1000))
+
+    # "Digitando": no máximo um user_typing por usuário/sala a cada
+    # TYPING_THROTTLE segundos; sem renovação, expira após TYPING_TIMEOUT
+    TYPING_THROTTLE = float(os.getenv('TYPING_THROTTLE', 2.0))
+    TYPING_TIMEOUT = float(os.getenv('TYPING_TIMEOUT', 6.0))
+
+    # Replay na reconexão: últimos eventos guardados por usuário
+    REPLAY_BUFFER_SIZE = int(os.getenv('REPLAY_BUFFER_SIZE', 200))
+    REPLAY_TTL_SECONDS = int(os.getenv('REPLAY_TTL_SECONDS', 3600))
+
+    # Backpressure: fila de saída (pacotes) por sessão
+    BACKPRESSURE_HIGH_WATER = int(os.getenv('BACKPRESSURE_HIGH_WATER', 200))
+    BACKPRESSURE_LOW_WATER = int(os.getenv('BACKPRESSURE_LOW_WATER', 50))
+    # Congestionada por mais que isso: sessão é desconectada
+    BACKPRESSURE_MAX_SECONDS = float(os.getenv('BACKPRESSURE_MAX_SECONDS', 30))
+    BACKPRESSURE_INTERVAL = float(os.getenv('BACKPRESSURE_INTERVAL', 1.0))
+
+    # Janela do EventBatcher (status de entrega/leitura e presença)
+    BATCH_WINDOW_MS = int(os.getenv('BATCH_WINDOW_MS', 20))
+
+    # Formato binário (MessagePack) para clientes que pedem `codec: 'msgpack'`
+    MSGPACK_ENABLED = os.getenv('MSGPACK_ENABLED', 'True') == 'True'
+
+    # Cache de usuários por id (UserRepository.find_by_id)
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', 60))
+    USER_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv('USER_CACHE_NEGATIVE_TTL_SECONDS', 10))
+    # L2 no armazenamento compartilhado (útil com vários workers + Redis)
+    USER_CACHE_SHARED = os.getenv('USER_CACHE_SHARED', 'False') == 'True'
+
+    # Importação de agenda: máximo de emails por requisição / por consulta IN
+    CONTACT_IMPORT_MAX = int(os.getenv('CONTACT_IMPORT_MAX', 5000))
+    CONTACT_IMPORT_CHUNK_SIZE = int(os.getenv('CONTACT_IMPORT_CHUNK_SIZE', 500))
+    # Nome do contato informado na agenda é cortado no tamanho da coluna contacts.contact_name
+    CONTACT_NAME_MAX_LENGTH = int(os.getenv('CONTACT_NAME_MAX_LENGTH', 100))
+
+    # Índice de busca de usuários: novos cadastros / reconstrução completa
+    USER_SEARCH_SYNC_SECONDS = int(os.getenv('USER_SEARCH_SYNC_SECONDS', 10))
+    USER_SEARCH_REBUILD_SECONDS = int(os.getenv('USER_SEARCH_REBUILD_SECONDS', 600))
+
+    # Grafo de contatos em memória: contatos novos / reconstrução completa
+    CONTACT_GRAPH_SYNC_SECONDS = int(os.getenv('CONTACT_GRAPH_SYNC_SECONDS', 5))
+    CONTACT_GRAPH_REBUILD_SECONDS = int(os.getenv('CONTACT_GRAPH_REBUILD_SECONDS', 600))
+    # Exclusões guardadas no log compartilhado até os outros workers aplicarem
+    CONTACT_GRAPH_REMOVALS_LOG = int(os.getenv('CONTACT_GRAPH_REMOVALS_LOG', 1000))
+
+    # Cache de GET /api/contacts (lista com última mensagem) por usuário
+    CONTACT_LIST_CACHE_SIZE = int(os.getenv('CONTACT_LIST_CACHE_SIZE', 10000))
+    CONTACT_LIST_TTL_SECONDS = int(os.getenv('CONTACT_LIST_TTL_SECONDS', 300))
+
+    # "Pessoas que você talvez conheça" (job `flask compute-suggestions`)
+    CONTACT_SUGGESTIONS_PER_USER = int(os.getenv('CONTACT_SUGGESTIONS_PER_USER', 20))
+    CONTACT_SUGGESTIONS_MIN_MUTUAL = int(os.getenv('CONTACT_SUGGESTIONS_MIN_MUTUAL', 1))
+    CONTACT_SUGGESTIONS_BLOCK_SIZE = int(os.getenv('CONTACT_SUGGESTIONS_BLOCK_SIZE', 2000))
+
+    # POST /api/batch: máximo de sub-requisições por chamada
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+
     # CORS
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
+
+    # Idempotência de envio (temp_id / Idempotency-Key)
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', 10000))
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 600))
+
+    # Pipeline de mensagens (fan-out e push fora do request)
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 4))
+    PIPELINE_MAX_PENDING = int(os.getenv('PIPELINE_MAX_PENDING', 1000))
+    MULTICAST_MAX_RECIPIENTS = int(os.getenv('MULTICAST_MAX_RECIPIENTS', 500))
+
+    # Recibos de entrega/leitura (gravados em lote)
+    RECEIPT_FLUSH_INTERVAL = float(os.getenv('RECEIPT_FLUSH_INTERVAL', 1.0))
+    RECEIPT_MAX_BATCH = int(os.getenv('RECEIPT_MAX_BATCH', 5000))
+
+    # Mensagens agendadas (janela em memória deve ser menor que o horizonte da roda)
+    SCHEDULER_TICK = float(os.getenv('SCHEDULER_TICK', 1.0))
+    SCHEDULER_LOAD_WINDOW = int(os.getenv('SCHEDULER_LOAD_WINDOW', 3600))
+    # Agendamento reivindicado ('sending') há mais que isso volta a 'pending' (worker caiu no envio)
+    SCHEDULER_CLAIM_TIMEOUT = int(os.getenv('SCHEDULER_CLAIM_TIMEOUT', 300))
+    # Despacho que falhou com erro (ex.: banco fora) volta para a roda após isso
+    SCHEDULER_RETRY_DELAY = float(os.getenv('SCHEDULER_RETRY_DELAY', 30))
     
     @staticmethod
     def get_db_config():
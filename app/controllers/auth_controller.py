@@ -1,5 +1,6 @@
 from flask import Blueprint, request, g
 from app.services.auth_service import AuthService
+from app.repositories.user_repository import UserRepository
 from app.utils.response import Response
 from app.middlewares.auth_middleware import require_auth
 
@@ -58,7 +59,12 @@ def login():
 @require_auth
 def get_current_user():
     try:
-        user = g.current_user
+        # g.current_user vem dos claims do token; aqui o registro completo
+        user = UserRepository.find_by_id(g.current_user.id)
+
+        if not user:
+            return Response.not_found("Usuário não encontrado")
+        
         return Response.success({'user': user.to_dict()})
     except Exception as e:
         return Response.error(f"Erro no servidor: {str(e)}", 500)
@@ -66,4 +72,19 @@ def get_current_user():
 @auth_bp.route('/verify', methods=['GET'])
 @require_auth
 def verify_token():
-    return Response.success(message="Token válido")
\ No newline at end of file
+    return Response.success(message="Token válido")
+
+@auth_bp.route('/logout', methods=['POST'])
+@require_auth
+def logout():
+    """
+    Revoga o token atual
+
+    Headers:
+        Authorization: Bearer <token>
+    """
+    try:
+        AuthService.revoke_token(g.auth_token)
+        return Response.success(message="Logout realizado com sucesso")
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
@@ -0,0 +1,105 @@
+from flask import Blueprint, request, g, current_app
+from app.config import Config
+from app.utils.database import Database
+from app.utils.metrics import Metrics
+from app.utils.response import Response
+from app.middlewares.auth_middleware import require_auth
+
+batch_bp = Blueprint('batch', __name__, url_prefix='/api/batch')
+
+ALLOWED_METHODS = {'GET', 'POST', 'PUT', 'DELETE'}
+
+def _dispatch(item):
+    """
+    Executa uma sub-requisição pelas rotas normais da API
+
+    O contexto de request aninhado reaproveita o app context da requisição
+    externa, então `g.current_user` e `g.batch_authenticated` continuam
+    valendo e `require_auth` não verifica o token de novo.
+
+    Returns:
+        dict: {"status": int, "body": dict}
+    """
+    if not isinstance(item, dict):
+        return {'status': 400, 'body': {'success': False, 'message': "Sub-requisição inválida"}}
+
+    method = str(item.get('method', 'GET')).upper()
+    path = item.get('path')
+
+    if method not in ALLOWED_METHODS:
+        return {'status': 405, 'body': {'success': False, 'message': "Método não permitido"}}
+
+    if not isinstance(path, str) or not path.startswith('/api/') or path.startswith(batch_bp.url_prefix):
+        return {'status': 400, 'body': {'success': False, 'message': "Caminho inválido"}}
+
+    options = {'method': method}
+    if item.get('body') is not None:
+        options['json'] = item['body']
+
+    try:
+        with current_app.test_request_context(path, **options):
+            response = current_app.full_dispatch_request()
+            return {'status': response.status_code, 'body': response.get_json(silent=True)}
+    except Exception as e:
+        return {'status': 500, 'body': {'success': False, 'message': f"Erro no servidor: {str(e)}"}}
+
+@batch_bp.route('', methods=['POST'])
+@batch_bp.route('/', methods=['POST'])
+@require_auth
+def batch():
+    """
+    Executa várias chamadas da API numa única requisição
+
+    Cada item vai para a rota correspondente com o mesmo usuário; o token é
+    verificado uma vez e todas as consultas usam uma única conexão do pool.
+    Os itens rodam em ordem e a falha de um não interrompe os demais.
+
+    Headers:
+        Authorization: Bearer <token>
+
+    Body:
+        {
+            "requests": [
+                {"method": "PUT", "path": "/api/messages/mark-read/12"},
+                {"method": "DELETE", "path": "/api/messages/345"},
+                {"method": "POST", "path": "/api/contacts/add", "body": {"contact_user_id": 7}}
+            ]
+        }
+
+    Response:
+        {
+            "success": true,
+            "data": {
+                "responses": [
+                    {"status": 200, "body": {...}},
+                    {"status": 404, "body": {...}}
+                ]
+            }
+        }
+    """
+    try:
+        data = request.get_json()
+
+        if not data or not isinstance(data.get('requests'), list):
+            return Response.error("Lista de requisições é obrigatória")
+
+        items = data['requests']
+
+        if len(items) > Config.BATCH_MAX_REQUESTS:
+            return Response.error(f"Máximo de {Config.BATCH_MAX_REQUESTS} requisições por lote")
+
+        g.batch_authenticated = True
+        try:
+            with Metrics.timer('batch'), Database.pinned():
+                responses = [_dispatch(item) for item in items]
+        finally:
+            g.batch_authenticated = False
+
+        Metrics.incr('batch.requests', len(items))
+
+        return Response.success({
+            'responses': responses
+        })
+
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
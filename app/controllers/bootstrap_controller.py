@@ -0,0 +1,63 @@
+from flask import Blueprint, g
+from app.repositories.user_repository import UserRepository
+from app.services.contact_service import ContactService
+from app.services.message_service import MessageService
+from app.services.push_service import PushService
+from app.utils.database import Database
+from app.utils.metrics import Metrics
+from app.utils.response import Response
+from app.middlewares.auth_middleware import require_auth
+
+bootstrap_bp = Blueprint('bootstrap', __name__, url_prefix='/api/bootstrap')
+
+@bootstrap_bp.route('', methods=['GET'])
+@bootstrap_bp.route('/', methods=['GET'])
+@require_auth
+def bootstrap():
+    """
+    Estado inicial do app numa única chamada
+
+    Substitui /api/auth/me, /api/contacts, /api/messages/unread,
+    /api/presence e /api/push/vapid-public-key na abertura do app: uma
+    verificação de token e uma única conexão do pool para todas as
+    consultas.
+
+    Headers:
+        Authorization: Bearer <token>
+
+    Response:
+        {
+            "success": true,
+            "data": {
+                "user": {...},
+                "contacts": [...],
+                "unread": {"total": 10, "by_contact": {"123": 5, "456": 5}},
+                "presence": {"123": {"online": true, "last_seen": 1700000000.0}},
+                "vapid_public_key": "..."
+            }
+        }
+    """
+    try:
+        with Metrics.timer('bootstrap'), Database.pinned():
+            user = UserRepository.find_by_id(g.current_user.id)
+
+            if not user:
+                return Response.not_found("Usuário não encontrado")
+
+            contacts = ContactService.get_user_contacts(user.id)
+            by_contact = MessageService.get_unread_by_contact(user.id)
+            presence = ContactService.get_contacts_presence(user.id)
+
+        return Response.success({
+            'user': user.to_dict(),
+            'contacts': contacts,
+            'unread': {
+                'total': sum(by_contact.values()),
+                'by_contact': by_contact
+            },
+            'presence': presence,
+            'vapid_public_key': PushService.get_vapid_public_key()
+        })
+
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, g
 from app.services.contact_service import ContactService
+from app.services.suggestion_service import SuggestionService
 from app.utils.response import Response
 from app.middlewares.auth_middleware import require_auth
 
@@ -51,6 +52,45 @@ def add_contact():
     except Exception as e:
         return Response.error(f"Erro no servidor: {str(e)}", 500)
     
+@contact_bp.route('/import', methods=["POST"])
+@require_auth
+def import_contacts():
+    """
+    Adiciona em lote os usuários encontrados numa agenda
+
+    Headers:
+        Authorization: Bearer <token>
+
+    Body:
+        {
+            "contacts": ["ana@email.com", {"email": "bia@email.com", "name": "Bia"}]
+        }
+
+    Response:
+        {
+            "added": [{"user_id", "name", "email", "contact_name"}],
+            "already_contacts": ["..."],
+            "not_found": ["..."],
+            "own_email": "..." | null
+        }
+    """
+    try:
+        user = g.current_user
+        data = request.get_json()
+
+        if not data:
+            return Response.error("Dados inválidos")
+        
+        result, error = ContactService.import_contacts(user.id, data.get('contacts'))
+
+        if error:
+            return Response.error(error)
+        
+        return Response.success(result, f"{len(result['added'])} contato(s) adicionado(s)")
+    
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
+    
 @contact_bp.route('/<int:contact_id>', methods=["PUT"])
 @require_auth
 def update_contact(contact_id):
@@ -112,5 +152,27 @@ def search_users():
             'users': users
         })
     
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
+
+@contact_bp.route('/suggestions', methods=["GET"])
+@require_auth
+def get_suggestions():
+    """
+    Pessoas que você talvez conheça, por número de contatos em comum
+
+    Response:
+        {
+            "users": [{"id", "name", "email", "mutual_count"}]
+        }
+    """
+    try:
+        user = g.current_user
+        users = SuggestionService.get_suggestions(user.id)
+
+        return Response.success({
+            'users': users
+        })
+    
     except Exception as e:
         return Response.error(f"Erro no servidor: {str(e)}", 500)
\ No newline at end of file
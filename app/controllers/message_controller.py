@@ -1,5 +1,7 @@
 from flask import Blueprint, request, g
 from app.services.message_service import MessageService
+from app.services.message_pipeline import MessagePipeline
+from app.services.schedule_service import ScheduleService
 from app.utils.response import Response
 from app.middlewares.auth_middleware import require_auth
 
@@ -13,11 +15,14 @@ def send_message():
     
     Headers:
         Authorization: Bearer <token>
+        Idempotency-Key: <chave única do envio> (opcional)
     
     Body:
         {
             "receiver_id": 123,
-            "content": "Olá, tudo bem?"
+            "content": "Olá, tudo bem?",
+            "temp_id": "temp_123",  (opcional, equivalente ao Idempotency-Key)
+            "send_at": "2025-01-01T09:00:00-03:00"  (opcional, agenda o envio)
         }
     
     Response:
@@ -28,6 +33,9 @@ def send_message():
                 "message": {...}
             }
         }
+
+    Um retry com a mesma chave devolve a mensagem original (200) sem
+    gravar uma nova.
     """
     try:
         user = g.current_user
@@ -38,6 +46,7 @@ def send_message():
         
         receiver_id = data.get('receiver_id')
         content = data.get('content')
+        client_id = request.headers.get('Idempotency-Key') or data.get('temp_id')
         
         if not receiver_id:
             return Response.error("ID do destinatário é obrigatório")
@@ -45,15 +54,39 @@ def send_message():
         if not content:
             return Response.error("Conteúdo da mensagem é obrigatório")
         
-        message, error = MessageService.send_message(
-            user.id,
+        send_at = data.get('send_at')
+        
+        if send_at:
+            scheduled, error = ScheduleService.schedule(
+                user.id,
+                receiver_id,
+                content,
+                send_at,
+                client_id
+            )
+            
+            if not scheduled:
+                return Response.error(error)
+            
+            return Response.created({
+                'scheduled': scheduled.to_dict()
+            }, "Mensagem agendada com sucesso")
+        
+        message, error = MessagePipeline.send(
+            user,
             receiver_id,
-            content
+            content,
+            client_id
         )
         
         if not message:
             return Response.error(error)
         
+        if message.is_duplicate:
+            return Response.success({
+                'message': message.to_dict()
+            }, "Mensagem já enviada")
+        
         return Response.created({
             'message': message.to_dict()
         }, "Mensagem enviada com sucesso")
@@ -61,6 +94,123 @@ def send_message():
     except Exception as e:
         return Response.error(f"Erro no servidor: {str(e)}", 500)
 
+@message_bp.route('/multicast', methods=['POST'])
+@require_auth
+def send_multicast():
+    """
+    Endpoint para enviar a mesma mensagem a vários destinatários
+    
+    Headers:
+        Authorization: Bearer <token>
+        Idempotency-Key: <chave única do envio> (opcional)
+    
+    Body:
+        {
+            "receiver_ids": [123, 456],
+            "content": "Aviso para todos"
+        }
+    
+    Response:
+        {
+            "success": true,
+            "message": "Mensagem enviada para 2 destinatário(s)",
+            "data": {
+                "messages": [...],
+                "invalid_ids": []
+            }
+        }
+    """
+    try:
+        user = g.current_user
+        data = request.get_json()
+        
+        if not data:
+            return Response.error("Dados inválidos")
+        
+        receiver_ids = data.get('receiver_ids')
+        content = data.get('content')
+        client_id = request.headers.get('Idempotency-Key') or data.get('temp_id')
+        
+        if not receiver_ids or not isinstance(receiver_ids, list):
+            return Response.error("Lista de destinatários é obrigatória")
+        
+        if not content:
+            return Response.error("Conteúdo da mensagem é obrigatório")
+        
+        messages, invalid_ids, error = MessagePipeline.send_multicast(
+            user,
+            receiver_ids,
+            content,
+            client_id
+        )
+        
+        if error:
+            return Response.error(error)
+        
+        return Response.created({
+            'messages': [message.to_dict() for message in messages],
+            'invalid_ids': invalid_ids
+        }, f"Mensagem enviada para {len(messages)} destinatário(s)")
+        
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
+
+@message_bp.route('/scheduled', methods=['GET'])
+@require_auth
+def get_scheduled():
+    """
+    Endpoint para listar mensagens agendadas pendentes do usuário
+    
+    Headers:
+        Authorization: Bearer <token>
+    
+    Response:
+        {
+            "success": true,
+            "data": {
+                "scheduled": [...]
+            }
+        }
+    """
+    try:
+        user = g.current_user
+        scheduled = ScheduleService.get_pending(user.id)
+        
+        return Response.success({
+            'scheduled': [item.to_dict() for item in scheduled]
+        })
+        
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
+
+@message_bp.route('/scheduled/<int:scheduled_id>', methods=['DELETE'])
+@require_auth
+def cancel_scheduled(scheduled_id):
+    """
+    Endpoint para cancelar uma mensagem agendada
+    
+    Headers:
+        Authorization: Bearer <token>
+    
+    Response:
+        {
+            "success": true,
+            "message": "Agendamento cancelado com sucesso"
+        }
+    """
+    try:
+        user = g.current_user
+        
+        success, error = ScheduleService.cancel(scheduled_id, user.id)
+        
+        if not success:
+            return Response.error(error)
+        
+        return Response.success(message="Agendamento cancelado com sucesso")
+        
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
+
 @message_bp.route('/conversation/<int:contact_user_id>', methods=['GET'])
 @require_auth
 def get_conversation(contact_user_id):
@@ -0,0 +1,53 @@
+from flask import Blueprint, request, g
+from app.config import Config
+from app.services.contact_service import ContactService
+from app.utils.response import Response
+from app.middlewares.auth_middleware import require_auth
+
+presence_bp = Blueprint('presence', __name__, url_prefix='/api/presence')
+
+@presence_bp.route('', methods=['GET'])
+@presence_bp.route('/', methods=['GET'])
+@require_auth
+def get_presence():
+    """
+    Endpoint para obter o status online dos contatos numa única chamada
+    
+    Headers:
+        Authorization: Bearer <token>
+    
+    Query Params:
+        ids: IDs separados por vírgula (padrão: todos os contatos)
+    
+    Response:
+        {
+            "success": true,
+            "data": {
+                "presence": {
+                    "123": {"online": true, "last_seen": 1700000000.0}
+                }
+            }
+        }
+    """
+    try:
+        user = g.current_user
+        ids_param = request.args.get('ids')
+        user_ids = None
+        
+        if ids_param:
+            try:
+                user_ids = [int(uid) for uid in ids_param.split(',') if uid.strip()]
+            except ValueError:
+                return Response.error("IDs inválidos")
+            
+            if len(user_ids) > Config.PRESENCE_SNAPSHOT_MAX_IDS:
+                return Response.error(f"Máximo de {Config.PRESENCE_SNAPSHOT_MAX_IDS} IDs por consulta")
+        
+        presence = ContactService.get_contacts_presence(user.id, user_ids)
+        
+        return Response.success({
+            'presence': presence
+        })
+    
+    except Exception as e:
+        return Response.error(f"Erro no servidor: {str(e)}", 500)
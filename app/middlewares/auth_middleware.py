@@ -6,6 +6,10 @@ from app.utils.response import Response
 def require_auth(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
+        # Sub-requisição de /api/batch: o token já foi verificado na requisição externa
+        if g.get('batch_authenticated'):
+            return f(*args, **kwargs)
+
         auth_header = request.headers.get('Authorization')
 
         if not auth_header:
@@ -24,6 +28,7 @@ def require_auth(f):
             return Response.unauthorized("Token inválido ou expirado.")
 
         g.current_user = user
+        g.auth_token = token
 
         return f(*args, **kwargs)
     
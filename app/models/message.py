@@ -2,13 +2,18 @@ from datetime import datetime
 
 class Message:
     def __init__(self, id=None, sender_id=None, receiver_id=None,
-                 content=None, is_read=False, created_at=None):
+                 content=None, is_read=False, created_at=None, client_id=None,
+                 delivered_at=None):
         self.id = id
         self.sender_id = sender_id
         self.receiver_id = receiver_id
         self.content = content
         self.is_read = is_read
         self.created_at = created_at or datetime.now()
+        self.client_id = client_id
+        self.delivered_at = delivered_at
+        # True quando o envio foi reconhecido como retry de uma mensagem já salva
+        self.is_duplicate = False
     
     def to_dict(self):
         return {
@@ -17,9 +22,21 @@ class Message:
             'receiver_id': self.receiver_id,
             'content': self.content,
             'is_read': self.is_read,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at
+            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
+            'client_id': self.client_id,
+            'delivered_at': self.delivered_at.isoformat() if isinstance(self.delivered_at, datetime) else self.delivered_at,
+            'status': Message.status_of(self.is_read, self.delivered_at)
         }
     
+    @staticmethod
+    def status_of(is_read, delivered_at):
+        """Estado de entrega exibido ao remetente"""
+        if is_read:
+            return 'read'
+        if delivered_at:
+            return 'delivered'
+        return 'sent'
+    
     @staticmethod
     def from_dict(data):
         return Message(
@@ -28,7 +45,9 @@ class Message:
             receiver_id=data.get('receiver_id'),
             content=data.get('content'),
             is_read=data.get('is_read', False),
-            created_at=data.get('created_at')
+            created_at=data.get('created_at'),
+            client_id=data.get('client_id'),
+            delivered_at=data.get('delivered_at')
         )
     
     def __repr__(self):
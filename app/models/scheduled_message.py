@@ -0,0 +1,44 @@
+from datetime import datetime
+
+class ScheduledMessage:
+    def __init__(self, id=None, sender_id=None, receiver_id=None, content=None,
+                 send_at=None, status='pending', message_id=None, created_at=None,
+                 client_id=None):
+        self.id = id
+        self.sender_id = sender_id
+        self.receiver_id = receiver_id
+        self.content = content
+        self.send_at = send_at
+        self.status = status
+        self.message_id = message_id
+        self.client_id = client_id
+        self.created_at = created_at or datetime.now()
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'sender_id': self.sender_id,
+            'receiver_id': self.receiver_id,
+            'content': self.content,
+            'send_at': self.send_at.isoformat() if isinstance(self.send_at, datetime) else self.send_at,
+            'status': self.status,
+            'message_id': self.message_id,
+            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at
+        }
+    
+    @staticmethod
+    def from_dict(data):
+        return ScheduledMessage(
+            id=data.get('id'),
+            sender_id=data.get('sender_id'),
+            receiver_id=data.get('receiver_id'),
+            content=data.get('content'),
+            send_at=data.get('send_at'),
+            status=data.get('status', 'pending'),
+            message_id=data.get('message_id'),
+            created_at=data.get('created_at'),
+            client_id=data.get('client_id')
+        )
+    
+    def __repr__(self):
+        return f"<ScheduledMessage id={self.id} sender_id={self.sender_id} send_at={self.send_at}>"
@@ -0,0 +1,256 @@
+import json
+import time
+import threading
+from array import array
+from bisect import bisect_left
+from app.config import Config
+from app.utils.database import Database
+from app.utils.metrics import Metrics
+from app.utils.shared_store import get_shared_store
+
+
+class ContactGraph:
+    """
+    Grafo de contatos em memória (listas de adjacência direta e reversa)
+
+    - `_forward[user_id]`: contatos de user_id
+    - `_reverse[contact_user_id]`: quem tem contact_user_id como contato
+
+    Cada lista é um `array('I')` ordenado (4 bytes por aresta, contra ~60
+    de um int num set), e a pertinência é uma busca binária: O(log d) no
+    grau do usuário.
+
+    Carregado em bloco na inicialização e mantido por
+    ContactRepository.create/create_many/delete. A cada
+    CONTACT_GRAPH_SYNC_SECONDS, `sync_new` traz o que outros workers
+    mudaram:
+
+    - contatos novos: linhas com `id > último carregado`
+    - exclusões: cada `remove` entra num log no armazenamento compartilhado
+      (`contact_graph:removed`, com sequência); os pares do log são
+      conferidos no banco e o grafo fica com o que o banco diz. Conferir em
+      vez de apagar direto resolve a ordem entre exclusão e re-adição.
+
+    Se o log foi truncado antes de ser lido (mais de
+    CONTACT_GRAPH_REMOVALS_LOG exclusões entre dois syncs), o grafo é
+    reconstruído. A reconstrução guarda a sequência do log antes de ler a
+    tabela, então exclusões feitas durante a leitura são reaplicadas no
+    sync seguinte. Até o primeiro carregamento, `ready` é False e o
+    repositório consulta o banco.
+    """
+
+    _LOG_KEY = 'contact_graph:removed'
+    _SEQ_KEY = 'contact_graph:removed:seq'
+
+    _lock = threading.Lock()
+    _forward = {}
+    _reverse = {}
+    _max_id = 0
+    _removed_seq = 0
+    ready = False
+    _thread = None
+
+    @staticmethod
+    def init_app():
+        if ContactGraph._thread is not None:
+            return
+
+        ContactGraph._thread = threading.Thread(
+            target=ContactGraph._run,
+            name='contact-graph',
+            daemon=True
+        )
+        ContactGraph._thread.start()
+
+    # ---------- consultas ----------
+
+    @staticmethod
+    def _contains(adjacency, key, value):
+        ids = adjacency.get(key)
+        if not ids:
+            return False
+        i = bisect_left(ids, value)
+        return i < len(ids) and ids[i] == value
+
+    @staticmethod
+    def has(user_id, contact_user_id):
+        """True se contact_user_id é contato de user_id"""
+        return ContactGraph._contains(ContactGraph._forward, user_id, contact_user_id)
+
+    @staticmethod
+    def contacts_of(user_id):
+        return set(ContactGraph._forward.get(user_id, ()))
+
+    @staticmethod
+    def watchers_of(contact_user_id):
+        return set(ContactGraph._reverse.get(contact_user_id, ()))
+
+    # ---------- atualização ----------
+
+    @staticmethod
+    def _insert(adjacency, key, value):
+        ids = adjacency.get(key)
+        if ids is None:
+            adjacency[key] = array('I', [value])
+            return
+        i = bisect_left(ids, value)
+        if i == len(ids) or ids[i] != value:
+            ids.insert(i, value)
+
+    @staticmethod
+    def _delete(adjacency, key, value):
+        ids = adjacency.get(key)
+        if not ids:
+            return
+        i = bisect_left(ids, value)
+        if i < len(ids) and ids[i] == value:
+            del ids[i]
+            if not ids:
+                del adjacency[key]
+
+    @staticmethod
+    def add(user_id, contact_user_id):
+        # _max_id não avança aqui: o sync relê a linha (idempotente), o que
+        # desfaz uma conferência de exclusão que rode junto com este add
+        with ContactGraph._lock:
+            ContactGraph._insert(ContactGraph._forward, user_id, contact_user_id)
+            ContactGraph._insert(ContactGraph._reverse, contact_user_id, user_id)
+
+    @staticmethod
+    def _discard(user_id, contact_user_id):
+        ContactGraph._delete(ContactGraph._forward, user_id, contact_user_id)
+        ContactGraph._delete(ContactGraph._reverse, contact_user_id, user_id)
+
+    @staticmethod
+    def remove(user_id, contact_user_id):
+        """Remove a aresta aqui e registra a exclusão para os outros workers"""
+        with ContactGraph._lock:
+            ContactGraph._discard(user_id, contact_user_id)
+
+        store = get_shared_store()
+        seq = store.incr(ContactGraph._SEQ_KEY)
+        store.rpush(
+            ContactGraph._LOG_KEY,
+            json.dumps([seq, user_id, contact_user_id]),
+            maxlen=Config.CONTACT_GRAPH_REMOVALS_LOG,
+            ttl=Config.CONTACT_GRAPH_REBUILD_SECONDS * 2
+        )
+
+    # ---------- carga ----------
+
+    @staticmethod
+    def _current_seq():
+        value = get_shared_store().get(ContactGraph._SEQ_KEY)
+        return int(value) if value is not None else 0
+
+    @staticmethod
+    def rebuild():
+        """Carrega a tabela inteira em listas novas e troca de uma vez"""
+        # Exclusões a partir daqui são reconferidas no próximo sync
+        removed_seq = ContactGraph._current_seq()
+        rows = Database.execute_query(
+            "SELECT id, user_id, contact_user_id FROM contacts",
+            fetch=True
+        ) or []
+
+        forward = {}
+        reverse = {}
+        for row in rows:
+            forward.setdefault(row['user_id'], []).append(row['contact_user_id'])
+            reverse.setdefault(row['contact_user_id'], []).append(row['user_id'])
+
+        forward = {key: array('I', sorted(set(ids))) for key, ids in forward.items()}
+        reverse = {key: array('I', sorted(set(ids))) for key, ids in reverse.items()}
+
+        with ContactGraph._lock:
+            ContactGraph._forward = forward
+            ContactGraph._reverse = reverse
+            ContactGraph._max_id = max((row['id'] for row in rows), default=0)
+            ContactGraph._removed_seq = removed_seq
+            ContactGraph.ready = True
+
+        Metrics.gauge('contact_graph.edges', len(rows))
+
+    @staticmethod
+    def _pending_removals():
+        """
+        Returns:
+            tuple: (entradas [seq, user_id, contact_user_id] ainda não
+            aplicadas, True se o log perdeu entradas)
+        """
+        applied = ContactGraph._removed_seq
+        if ContactGraph._current_seq() <= applied:
+            return [], False
+
+        entries = [json.loads(item) for item in get_shared_store().lrange(ContactGraph._LOG_KEY)]
+        entries = [entry for entry in entries if entry[0] > applied]
+        gap = not entries or entries[0][0] > applied + 1
+        return entries, gap
+
+    @staticmethod
+    def _existing_pairs(pairs):
+        """Dos pares (user_id, contact_user_id), os que existem no banco"""
+        pairs = list(pairs)
+        if not pairs:
+            return set()
+
+        placeholders = ','.join(['(%s,%s)'] * len(pairs))
+        query = f"""
+            SELECT user_id, contact_user_id FROM contacts
+            WHERE (user_id, contact_user_id) IN ({placeholders})
+        """
+        params = tuple(value for pair in pairs for value in pair)
+        results = Database.execute_query(query, params, fetch=True) or []
+        return {(row['user_id'], row['contact_user_id']) for row in results}
+
+    @staticmethod
+    def sync_new():
+        """Aplica contatos criados e excluídos depois do último carregamento"""
+        rows = Database.execute_query(
+            "SELECT id, user_id, contact_user_id FROM contacts WHERE id > %s",
+            (ContactGraph._max_id,),
+            fetch=True
+        ) or []
+
+        # Lido depois das linhas novas: a conferência é mais recente que elas
+        entries, gap = ContactGraph._pending_removals()
+        if gap:
+            Metrics.incr('contact_graph.removals_gap')
+            ContactGraph.rebuild()
+            return
+
+        pairs = {(entry[1], entry[2]) for entry in entries}
+        existing = ContactGraph._existing_pairs(pairs)
+
+        with ContactGraph._lock:
+            for row in rows:
+                ContactGraph._insert(ContactGraph._forward, row['user_id'], row['contact_user_id'])
+                ContactGraph._insert(ContactGraph._reverse, row['contact_user_id'], row['user_id'])
+                ContactGraph._max_id = max(ContactGraph._max_id, row['id'])
+
+            # O grafo fica com o que o banco diz agora sobre cada par do log
+            for user_id, contact_user_id in pairs:
+                if (user_id, contact_user_id) in existing:
+                    ContactGraph._insert(ContactGraph._forward, user_id, contact_user_id)
+                    ContactGraph._insert(ContactGraph._reverse, contact_user_id, user_id)
+                else:
+                    ContactGraph._discard(user_id, contact_user_id)
+
+            if entries:
+                ContactGraph._removed_seq = entries[-1][0]
+
+    @staticmethod
+    def _run():
+        last_rebuild = 0.0
+        while True:
+            try:
+                if time.time() - last_rebuild >= Config.CONTACT_GRAPH_REBUILD_SECONDS:
+                    ContactGraph.rebuild()
+                    last_rebuild = time.time()
+                    print(f"🕸️ Grafo de contatos carregado ({len(ContactGraph._forward)} usuários)")
+                else:
+                    ContactGraph.sync_new()
+            except Exception as e:
+                print(f"❌ Erro ao atualizar grafo de contatos: {e}")
+
+            time.sleep(Config.CONTACT_GRAPH_SYNC_SECONDS)
@@ -1,5 +1,6 @@
 from app.utils.database import Database
 from app.models.contact import Contact
+from app.repositories.contact_graph import ContactGraph
 
 class ContactRepository:
     @staticmethod
@@ -11,8 +12,27 @@ class ContactRepository:
         params = (contact.user_id, contact.contact_user_id, contact.contact_name)
         contact_id = Database.execute_query(query, params)
         contact.id = contact_id
+        ContactGraph.add(contact.user_id, contact.contact_user_id)
         return contact
     
+    @staticmethod
+    def create_many(contacts):
+        """Insere vários contatos com um único execute_many"""
+        if not contacts:
+            return 0
+        
+        query = """
+            INSERT INTO contacts (user_id, contact_user_id, contact_name)
+            VALUES (%s,%s,%s)
+        """
+        count = Database.execute_many(query, [
+            (contact.user_id, contact.contact_user_id, contact.contact_name)
+            for contact in contacts
+        ])
+        for contact in contacts:
+            ContactGraph.add(contact.user_id, contact.contact_user_id)
+        return count
+    
     @staticmethod
     def find_by_id(contact_id):
         query = "SELECT * FROM contacts WHERE id = %s"
@@ -42,8 +62,31 @@ class ContactRepository:
             results = Database.execute_query(query, (user_id,), fetch=True)
             return results if results else []
     
+    @staticmethod
+    def find_watcher_ids(contact_user_id):
+        """IDs dos usuários que têm `contact_user_id` como contato"""
+        if ContactGraph.ready:
+            return ContactGraph.watchers_of(contact_user_id)
+        
+        query = "SELECT user_id FROM contacts WHERE contact_user_id = %s"
+        results = Database.execute_query(query, (contact_user_id,), fetch=True)
+        return {row['user_id'] for row in results} if results else set()
+    
+    @staticmethod
+    def find_contact_user_ids(user_id):
+        """IDs dos contatos de `user_id`"""
+        if ContactGraph.ready:
+            return ContactGraph.contacts_of(user_id)
+        
+        query = "SELECT contact_user_id FROM contacts WHERE user_id = %s"
+        results = Database.execute_query(query, (user_id,), fetch=True)
+        return {row['contact_user_id'] for row in results} if results else set()
+    
     @staticmethod
     def contact_exists(user_id, contact_user_id):
+        if ContactGraph.ready:
+            return ContactGraph.has(user_id, contact_user_id)
+        
         query = """
             SELECT COUNT(*) as count
             FROM contacts
@@ -64,12 +107,20 @@ class ContactRepository:
     
     @staticmethod
     def delete(contact_id):
+        contact = ContactRepository.find_by_id(contact_id)
+        if not contact:
+            return False
+        
         query = "DELETE FROM contacts WHERE id = %s"
         rows_affected = Database.execute_query(query, (contact_id,))
+        if rows_affected > 0:
+            ContactGraph.remove(contact.user_id, contact.contact_user_id)
         return rows_affected > 0
     
     @staticmethod
     def delete_by_users(user_id, contact_user_id):
         query = "DELETE FROM contacts WHERE user_id = %s AND contact_user_id = %s"
         rows_affected = Database.execute_query(query, (user_id, contact_user_id))
+        if rows_affected > 0:
+            ContactGraph.remove(user_id, contact_user_id)
         return rows_affected > 0
\ No newline at end of file
@@ -5,20 +5,65 @@ class MessageRepository:
     @staticmethod
     def create(message):  # ← ERA "created"
         query = """
-            INSERT INTO messages (sender_id, receiver_id, content, is_read)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO messages (sender_id, receiver_id, content, is_read, client_id)
+            VALUES (%s, %s, %s, %s, %s)
         """
-        params = (message.sender_id, message.receiver_id, message.content, message.is_read)
+        params = (message.sender_id, message.receiver_id, message.content, message.is_read, message.client_id)
         message_id = Database.execute_query(query, params)
         message.id = message_id
         return message
     
+    @staticmethod
+    def create_many(messages):
+        """
+        Insere várias mensagens com um único execute_many
+
+        Cada mensagem precisa de um client_id único; os IDs gerados são
+        recuperados por ele (UNIQUE sender_id, client_id).
+        """
+        if not messages:
+            return []
+        
+        query = """
+            INSERT INTO messages (sender_id, receiver_id, content, is_read, client_id)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        Database.execute_many(query, [
+            (m.sender_id, m.receiver_id, m.content, m.is_read, m.client_id)
+            for m in messages
+        ])
+        
+        saved = MessageRepository.find_by_client_ids(
+            messages[0].sender_id, [m.client_id for m in messages]
+        )
+        by_client_id = {m.client_id: m for m in saved}
+        return [by_client_id[m.client_id] for m in messages if m.client_id in by_client_id]
+    
     @staticmethod
     def find_by_id(message_id):
         query = "SELECT * FROM messages WHERE id = %s"
         result = Database.execute_query(query, (message_id,), fetch=True, fetch_one=True)
         return Message.from_dict(result) if result else None
     
+    @staticmethod
+    def find_by_client_id(sender_id, client_id):
+        query = "SELECT * FROM messages WHERE sender_id = %s AND client_id = %s"
+        result = Database.execute_query(query, (sender_id, client_id), fetch=True, fetch_one=True)
+        return Message.from_dict(result) if result else None
+    
+    @staticmethod
+    def find_by_client_ids(sender_id, client_ids):
+        if not client_ids:
+            return []
+        
+        placeholders = ', '.join(['%s'] * len(client_ids))
+        query = f"""
+            SELECT * FROM messages
+            WHERE sender_id = %s AND client_id IN ({placeholders})
+        """
+        results = Database.execute_query(query, (sender_id, *client_ids), fetch=True)
+        return [Message.from_dict(row) for row in results] if results else []
+    
     @staticmethod
     def get_conversation(user1_id, user2_id, limit=50):
         try:
@@ -53,12 +98,45 @@ class MessageRepository:
     def mark_as_read(receiver_id, sender_id):
         query = """
             UPDATE messages
-            SET is_read = TRUE
+            SET is_read = TRUE, delivered_at = COALESCE(delivered_at, NOW())
             WHERE receiver_id = %s AND sender_id = %s AND is_read = FALSE
         """
         rows_affected = Database.execute_query(query, (receiver_id, sender_id))
         return rows_affected
     
+    @staticmethod
+    def mark_many_delivered(receipts):
+        """
+        Grava recibos de entrega em lote
+
+        Args:
+            receipts (list): Tuplas (delivered_at, message_id, receiver_id)
+        """
+        query = """
+            UPDATE messages
+            SET delivered_at = COALESCE(delivered_at, %s)
+            WHERE id = %s AND receiver_id = %s
+        """
+        return Database.execute_many(query, receipts)
+    
+    @staticmethod
+    def mark_many_read(receipts):
+        """
+        Grava recibos de leitura em lote
+
+        Args:
+            receipts (list): Tuplas (read_at, receiver_id, sender_id,
+                read_until, read_up_to_id) - marca as mensagens criadas até
+                `read_until` ou com id até `read_up_to_id` (None desativa o limite)
+        """
+        query = """
+            UPDATE messages
+            SET is_read = TRUE, delivered_at = COALESCE(delivered_at, %s)
+            WHERE receiver_id = %s AND sender_id = %s AND is_read = FALSE
+              AND (created_at <= %s OR id <= %s)
+        """
+        return Database.execute_many(query, receipts)
+    
     @staticmethod
     def get_unread_count(user_id):
         query = """
@@ -34,6 +34,21 @@ class PushRepository:
         """
         return Database.execute_query(query, (user_id,), fetch=True)
     
+    @staticmethod
+    def find_by_user_ids(user_ids):
+        """
+        Busca as subscriptions de vários usuários numa única consulta
+        """
+        if not user_ids:
+            return []
+        
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        query = f"""
+            SELECT * FROM push_subscriptions
+            WHERE user_id IN ({placeholders})
+        """
+        return Database.execute_query(query, tuple(user_ids), fetch=True)
+    
     @staticmethod
     def find_by_endpoint(endpoint):
         """
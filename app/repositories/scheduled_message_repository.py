@@ -0,0 +1,110 @@
+from app.utils.database import Database
+from app.models.scheduled_message import ScheduledMessage
+
+class ScheduledMessageRepository:
+    @staticmethod
+    def create(scheduled):
+        query = """
+            INSERT INTO scheduled_messages (sender_id, receiver_id, content, client_id, send_at, status)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        params = (scheduled.sender_id, scheduled.receiver_id, scheduled.content,
+                  scheduled.client_id, scheduled.send_at, scheduled.status)
+        scheduled.id = Database.execute_query(query, params)
+        return scheduled
+    
+    @staticmethod
+    def find_by_id(scheduled_id):
+        query = "SELECT * FROM scheduled_messages WHERE id = %s"
+        result = Database.execute_query(query, (scheduled_id,), fetch=True, fetch_one=True)
+        return ScheduledMessage.from_dict(result) if result else None
+    
+    @staticmethod
+    def find_by_client_id(sender_id, client_id):
+        query = "SELECT * FROM scheduled_messages WHERE sender_id = %s AND client_id = %s"
+        result = Database.execute_query(query, (sender_id, client_id), fetch=True, fetch_one=True)
+        return ScheduledMessage.from_dict(result) if result else None
+    
+    @staticmethod
+    def find_pending_before(until):
+        """Pendentes com send_at < until (range scan em idx_scheduled_status_send_at)"""
+        query = """
+            SELECT * FROM scheduled_messages
+            WHERE status = 'pending' AND send_at < %s
+            ORDER BY send_at
+        """
+        results = Database.execute_query(query, (until,), fetch=True)
+        return [ScheduledMessage.from_dict(row) for row in results] if results else []
+    
+    @staticmethod
+    def find_pending_between(start, end):
+        """Pendentes com start <= send_at < end"""
+        query = """
+            SELECT * FROM scheduled_messages
+            WHERE status = 'pending' AND send_at >= %s AND send_at < %s
+            ORDER BY send_at
+        """
+        results = Database.execute_query(query, (start, end), fetch=True)
+        return [ScheduledMessage.from_dict(row) for row in results] if results else []
+    
+    @staticmethod
+    def find_pending_by_sender(sender_id):
+        query = """
+            SELECT * FROM scheduled_messages
+            WHERE sender_id = %s AND status = 'pending'
+            ORDER BY send_at
+        """
+        results = Database.execute_query(query, (sender_id,), fetch=True)
+        return [ScheduledMessage.from_dict(row) for row in results] if results else []
+    
+    @staticmethod
+    def claim(scheduled_id):
+        """
+        Reivindica o agendamento para envio (pending -> sending)
+
+        Returns:
+            bool: False se outro processo já reivindicou ou se foi cancelado
+        """
+        query = """
+            UPDATE scheduled_messages
+            SET status = 'sending', claimed_at = NOW()
+            WHERE id = %s AND status = 'pending'
+        """
+        return Database.execute_query(query, (scheduled_id,)) > 0
+    
+    @staticmethod
+    def release_stale(timeout_seconds):
+        """Devolve a 'pending' reivindicações de um processo que caiu no meio do envio"""
+        query = """
+            UPDATE scheduled_messages
+            SET status = 'pending', claimed_at = NULL
+            WHERE status = 'sending' AND claimed_at < NOW() - INTERVAL %s SECOND
+        """
+        return Database.execute_query(query, (timeout_seconds,))
+    
+    @staticmethod
+    def mark_sent(scheduled_id, message_id):
+        query = """
+            UPDATE scheduled_messages
+            SET status = 'sent', message_id = %s
+            WHERE id = %s AND status = 'sending'
+        """
+        return Database.execute_query(query, (message_id, scheduled_id)) > 0
+    
+    @staticmethod
+    def mark_failed(scheduled_id):
+        query = """
+            UPDATE scheduled_messages
+            SET status = 'failed'
+            WHERE id = %s AND status = 'sending'
+        """
+        return Database.execute_query(query, (scheduled_id,)) > 0
+    
+    @staticmethod
+    def cancel(scheduled_id, sender_id):
+        query = """
+            UPDATE scheduled_messages
+            SET status = 'canceled'
+            WHERE id = %s AND sender_id = %s AND status = 'pending'
+        """
+        return Database.execute_query(query, (scheduled_id, sender_id)) > 0
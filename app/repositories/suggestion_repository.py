@@ -0,0 +1,55 @@
+from app.utils.database import Database
+
+class SuggestionRepository:
+    @staticmethod
+    def find_all_edges():
+        """Todas as arestas (user_id, contact_user_id) da tabela contacts"""
+        query = "SELECT user_id, contact_user_id FROM contacts"
+        results = Database.execute_query(query, fetch=True)
+        return [(row['user_id'], row['contact_user_id']) for row in results] if results else []
+
+    @staticmethod
+    def upsert_many(rows, computed_at):
+        """
+        Grava sugestões (user_id, suggested_user_id, mutual_count)
+
+        Pares já existentes têm a contagem e `computed_at` atualizados
+        """
+        if not rows:
+            return 0
+
+        query = """
+            INSERT INTO contact_suggestions
+                (user_id, suggested_user_id, mutual_count, computed_at)
+            VALUES (%s,%s,%s,%s)
+            ON DUPLICATE KEY UPDATE
+                mutual_count = VALUES(mutual_count),
+                computed_at = VALUES(computed_at)
+        """
+        return Database.execute_many(query, [
+            (user_id, suggested_user_id, mutual_count, computed_at)
+            for user_id, suggested_user_id, mutual_count in rows
+        ])
+
+    @staticmethod
+    def delete_older_than(computed_at):
+        """Remove sugestões que não saíram na última execução do job"""
+        query = "DELETE FROM contact_suggestions WHERE computed_at < %s"
+        return Database.execute_query(query, (computed_at,))
+
+    @staticmethod
+    def find_by_user(user_id, limit=20):
+        query = """
+            SELECT
+                u.id,
+                u.name,
+                u.email,
+                s.mutual_count
+            FROM contact_suggestions s
+            INNER JOIN users u ON u.id = s.suggested_user_id
+            WHERE s.user_id = %s
+            ORDER BY s.mutual_count DESC, u.name
+            LIMIT %s
+        """
+        results = Database.execute_query(query, (user_id, limit), fetch=True)
+        return results or []
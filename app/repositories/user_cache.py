@@ -0,0 +1,113 @@
+import copy
+import json
+from datetime import datetime
+from app.config import Config
+from app.models.user import User
+from app.utils.cache import TTLCache
+from app.utils.metrics import Metrics
+from app.utils.shared_store import get_shared_store
+
+# Marca de "usuário não existe" (cache negativo)
+_MISSING = object()
+
+
+class UserCache:
+    """
+    Cache de usuários por id na frente do UserRepository
+
+    - L1: TTLCache no processo (USER_CACHE_SIZE entradas, USER_CACHE_TTL_SECONDS)
+    - L2 opcional (USER_CACHE_SHARED): armazenamento compartilhado, para
+      que um worker aproveite o que outro já buscou
+    - ids inexistentes ficam em cache por USER_CACHE_NEGATIVE_TTL_SECONDS
+
+    `update`/`delete` invalidam o L1 do próprio processo e o L2; o L1 dos
+    outros workers expira pelo TTL.
+
+    Só os campos públicos entram no cache (nunca o `password_hash`): quem
+    precisa do hash (login) lê do banco com `find_by_email`.
+    """
+
+    _local = TTLCache(
+        maxsize=Config.USER_CACHE_SIZE,
+        ttl=Config.USER_CACHE_TTL_SECONDS
+    )
+
+    @staticmethod
+    def _key(user_id):
+        return f"user:{user_id}"
+
+    @staticmethod
+    def get(user_id):
+        """
+        Returns:
+            tuple: (found, user) - `found` é False se o cache não sabe nada
+            sobre o id; com found=True, user None significa inexistente
+        """
+        value = UserCache._local.get(user_id)
+        if value is not None:
+            if value is _MISSING:
+                Metrics.incr('user_cache.negative_hits')
+                return True, None
+            Metrics.incr('user_cache.hits')
+            return True, copy.copy(value)
+
+        if Config.USER_CACHE_SHARED:
+            try:
+                raw = get_shared_store().get(UserCache._key(user_id))
+            except Exception as e:
+                print(f"⚠️ Erro ao ler cache compartilhado de usuários: {e}")
+                raw = None
+
+            if raw is not None:
+                Metrics.incr('user_cache.l2_hits')
+                user = UserCache._decode(raw)
+                if user is None:
+                    UserCache._local.set(user_id, _MISSING, ttl=Config.USER_CACHE_NEGATIVE_TTL_SECONDS)
+                    return True, None
+                UserCache._local.set(user_id, user)
+                return True, copy.copy(user)
+
+        Metrics.incr('user_cache.misses')
+        return False, None
+
+    @staticmethod
+    def set(user_id, user):
+        if user is None:
+            ttl = Config.USER_CACHE_NEGATIVE_TTL_SECONDS
+            UserCache._local.set(user_id, _MISSING, ttl=ttl)
+        else:
+            ttl = Config.USER_CACHE_TTL_SECONDS
+            user = copy.copy(user)
+            user.password_hash = None
+            UserCache._local.set(user_id, user)
+
+        if Config.USER_CACHE_SHARED:
+            try:
+                get_shared_store().set(UserCache._key(user_id), UserCache._encode(user), ttl=ttl)
+            except Exception as e:
+                print(f"⚠️ Erro ao gravar cache compartilhado de usuários: {e}")
+
+    @staticmethod
+    def invalidate(user_id):
+        UserCache._local.delete(user_id)
+
+        if Config.USER_CACHE_SHARED:
+            try:
+                get_shared_store().delete(UserCache._key(user_id))
+            except Exception as e:
+                print(f"⚠️ Erro ao invalidar cache compartilhado de usuários: {e}")
+
+    @staticmethod
+    def _encode(user):
+        return json.dumps(user.to_dict() if user else None)
+
+    @staticmethod
+    def _decode(raw):
+        data = json.loads(raw)
+        if data is None:
+            return None
+
+        for field in ('created_at', 'updated_at'):
+            if isinstance(data.get(field), str):
+                data[field] = datetime.fromisoformat(data[field])
+        return User.from_dict(data)
@@ -1,5 +1,7 @@
 from app.utils.database import Database
 from app.models.user import User
+from app.repositories.user_cache import UserCache
+from app.repositories.user_search_index import UserSearchIndex
 
 class UserRepository:
     @staticmethod
@@ -11,13 +13,34 @@ class UserRepository:
         params = (user.name, user.email, user.password_hash)
         user_id = Database.execute_query(query, params)
         user.id = user_id
+        # Descarta um possível "não existe" guardado para o id
+        UserCache.invalidate(user_id)
+        # Já aparece na busca deste worker, sem esperar o sync
+        UserSearchIndex.upsert(user)
         return user
 
     @staticmethod
     def find_by_id(user_id):
+        found, user = UserCache.get(user_id)
+        if found:
+            return user
+
         query = "SELECT * FROM users WHERE id = %s"
         result = Database.execute_query(query, (user_id,), fetch=True, fetch_one=True)
-        return User.from_dict(result) if result else None
+        user = User.from_dict(result) if result else None
+        UserCache.set(user_id, user)
+        return user
+    
+    @staticmethod
+    def find_existing_ids(user_ids):
+        """Retorna o subconjunto de `user_ids` que existe (uma única consulta IN)"""
+        if not user_ids:
+            return set()
+        
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        query = f"SELECT id FROM users WHERE id IN ({placeholders})"
+        results = Database.execute_query(query, tuple(user_ids), fetch=True)
+        return {row['id'] for row in results} if results else set()
     
     @staticmethod
     def find_by_email(email):
@@ -25,6 +48,21 @@ class UserRepository:
         result = Database.execute_query(query, (email,), fetch=True, fetch_one=True)
         return User.from_dict(result) if result else None
     
+    @staticmethod
+    def find_by_emails(emails, chunk_size=500):
+        """Usuários com os emails dados (consultas IN em blocos de `chunk_size`)"""
+        emails = list(emails)
+        users = []
+        
+        for start in range(0, len(emails), chunk_size):
+            chunk = emails[start:start + chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            query = f"SELECT id, name, email FROM users WHERE email IN ({placeholders})"
+            results = Database.execute_query(query, tuple(chunk), fetch=True)
+            users.extend(User.from_dict(row) for row in results or [])
+        
+        return users
+    
     @staticmethod
     def email_exists(email):
         query = "SELECT COUNT(*) as count FROM users WHERE email = %s"
@@ -40,16 +78,48 @@ class UserRepository:
         """
         params = (user.name, user.email, user.id)
         Database.execute_query(query, params)
+        UserCache.invalidate(user.id)
+        UserSearchIndex.upsert(user)
+        UserRepository._invalidate_tokens(user.id)
         return user
     
+    @staticmethod
+    def update_password_hash(user_id, password_hash):
+        query = "UPDATE users SET password_hash = %s WHERE id = %s"
+        Database.execute_query(query, (password_hash, user_id))
+        UserCache.invalidate(user_id)
+    
     @staticmethod
     def delete(user_id):
         query = "DELETE FROM users WHERE id = %s"
         rows_affected = Database.execute_query(query, (user_id,))
+        UserCache.invalidate(user_id)
+        UserSearchIndex.remove(user_id)
+        UserRepository._invalidate_tokens(user_id)
         return rows_affected > 0
     
     @staticmethod
-    def search_by_email_or_name(search_term, exclude_user_id=None):
+    def _invalidate_tokens(user_id):
+        # Claims (nome/email) dos tokens emitidos deixam de valer
+        from app.services.auth_service import AuthService
+        AuthService.invalidate_user_tokens(user_id)
+    
+    @staticmethod
+    def search_by_email_or_name(search_term, exclude_user_id=None, exclude_ids=()):
+        """
+        Busca por trecho do nome ou do email (até 20, melhores primeiro)
+
+        Usa o UserSearchIndex em memória; enquanto ele carrega, cai no
+        LIKE do banco.
+        """
+        exclude = set(exclude_ids)
+        if exclude_user_id:
+            exclude.add(exclude_user_id)
+
+        found = UserSearchIndex.search(search_term, exclude=exclude, limit=20)
+        if found is not None:
+            return [User(id=user_id, name=name, email=email) for user_id, name, email in found]
+
         if exclude_user_id:
             query = """
                 SELECT id, name, email, created_at
@@ -68,4 +138,5 @@ class UserRepository:
             params = (f"%{search_term}%", f"%{search_term}%")
         
         results = Database.execute_query(query, params, fetch=True)
-        return [User.from_dict(row) for row in results] if results else []
\ No newline at end of file
+        users = [User.from_dict(row) for row in results] if results else []
+        return [user for user in users if user.id not in exclude]
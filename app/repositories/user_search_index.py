@@ -0,0 +1,102 @@
+import time
+import threading
+from app.config import Config
+from app.utils.database import Database
+from app.utils.metrics import Metrics
+from app.utils.ngram_index import NGramIndex
+
+
+class UserSearchIndex:
+    """
+    Índice em memória de nome/email dos usuários para a busca de contatos
+
+    Carregado em segundo plano na inicialização e mantido por
+    UserRepository.create/update/delete. Para enxergar cadastros feitos em
+    outros workers, a cada USER_SEARCH_SYNC_SECONDS busca os ids novos
+    (`id > último carregado`) e a cada USER_SEARCH_REBUILD_SECONDS
+    reconstrói tudo (pega edições e exclusões remotas).
+
+    Enquanto o primeiro carregamento não termina, `search` devolve None e
+    o repositório usa a consulta SQL.
+    """
+
+    _index = NGramIndex()
+    _ready = False
+    _max_id = 0
+    _thread = None
+
+    @staticmethod
+    def init_app():
+        if UserSearchIndex._thread is not None:
+            return
+
+        UserSearchIndex._thread = threading.Thread(
+            target=UserSearchIndex._run,
+            name='user-search-index',
+            daemon=True
+        )
+        UserSearchIndex._thread.start()
+
+    @staticmethod
+    def upsert(user):
+        # Não avança `_max_id`: ids menores gravados por outros workers
+        # ainda não sincronizados seriam pulados pelo sync_new
+        UserSearchIndex._index.add(user.id, user.name, user.email)
+
+    @staticmethod
+    def remove(user_id):
+        UserSearchIndex._index.remove(user_id)
+
+    @staticmethod
+    def search(term, exclude=(), limit=20):
+        """
+        Returns:
+            list: Tuplas (id, name, email) ranqueadas, ou None se o índice
+            ainda não está pronto
+        """
+        if not UserSearchIndex._ready:
+            return None
+
+        with Metrics.timer('user_search.query'):
+            return UserSearchIndex._index.search(term, limit=limit, exclude=exclude)
+
+    @staticmethod
+    def rebuild():
+        """Carrega todos os usuários num índice novo e troca de uma vez"""
+        index = NGramIndex()
+        rows = Database.execute_query("SELECT id, name, email FROM users", fetch=True) or []
+        for row in rows:
+            index.add(row['id'], row['name'], row['email'])
+
+        UserSearchIndex._index = index
+        UserSearchIndex._max_id = max((row['id'] for row in rows), default=0)
+        UserSearchIndex._ready = True
+        Metrics.gauge('user_search.size', len(index))
+
+    @staticmethod
+    def sync_new():
+        """Indexa usuários criados depois do último carregamento"""
+        rows = Database.execute_query(
+            "SELECT id, name, email FROM users WHERE id > %s",
+            (UserSearchIndex._max_id,),
+            fetch=True
+        ) or []
+        for row in rows:
+            UserSearchIndex._index.add(row['id'], row['name'], row['email'])
+            UserSearchIndex._max_id = max(UserSearchIndex._max_id, row['id'])
+
+    @staticmethod
+    def _run():
+        last_rebuild = 0.0
+        while True:
+            try:
+                if time.time() - last_rebuild >= Config.USER_SEARCH_REBUILD_SECONDS:
+                    UserSearchIndex.rebuild()
+                    last_rebuild = time.time()
+                    print(f"🔎 Índice de busca de usuários carregado ({len(UserSearchIndex._index)} usuários)")
+                else:
+                    UserSearchIndex.sync_new()
+            except Exception as e:
+                print(f"❌ Erro ao atualizar índice de busca de usuários: {e}")
+
+            time.sleep(Config.USER_SEARCH_SYNC_SECONDS)
@@ -1,29 +1,63 @@
 import bcrypt
+import hashlib
 import jwt
+import time
+import uuid
 from datetime import datetime, timedelta
 from app.config import Config
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
+from app.utils.blocking_pool import BlockingPool
+from app.utils.cache import TTLCache
+from app.utils.metrics import Metrics
+from app.utils.shared_store import get_shared_store
 
 class AuthService:
+    # sha256(token) -> claims já verificados (até AUTH_TOKEN_CACHE_TTL_SECONDS ou `exp`)
+    _verified_tokens = TTLCache(
+        maxsize=Config.AUTH_TOKEN_CACHE_SIZE,
+        ttl=Config.AUTH_TOKEN_CACHE_TTL_SECONDS
+    )
+
+    # bcrypt roda em threads nativas, com no máximo BCRYPT_MAX_CONCURRENCY por vez
+    _bcrypt_pool = BlockingPool('bcrypt', max_concurrency=Config.BCRYPT_MAX_CONCURRENCY)
+
     @staticmethod
     def hash_password(password):
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+        salt = bcrypt.gensalt(rounds=Config.BCRYPT_ROUNDS)
+        hashed = AuthService._bcrypt_pool.run(bcrypt.hashpw, password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
     
     @staticmethod
     def verify_password(password, hashed_password):
-        return bcrypt.checkpw(
+        return AuthService._bcrypt_pool.run(
+            bcrypt.checkpw,
             password.encode('utf-8'),
             hashed_password.encode('utf-8')
         )
+
+    @staticmethod
+    def needs_rehash(hashed_password):
+        """True se o hash usa um custo diferente de BCRYPT_ROUNDS"""
+        try:
+            # Formato: $2b$<custo>$<salt+hash>
+            return int(hashed_password.split('$')[2]) != Config.BCRYPT_ROUNDS
+        except (IndexError, ValueError):
+            return False
     
     @staticmethod
-    def generate_token(user_id):
+    def generate_token(user):
+        """
+        Gera o JWT com os dados de identidade que os handlers usam
+        (id, nome, email), dispensando o banco na autenticação
+        """
         payload = {
-            'user_id': user_id,
-            'exp': datetime.utcnow() + timedelta(days=Config.JWT_EXPIRATION_HOURS),
+            'user_id': user.id,
+            'name': user.name,
+            'email': user.email,
+            'ver': AuthService._token_version(user.id),
+            'jti': uuid.uuid4().hex,
+            'exp': datetime.utcnow() + timedelta(hours=Config.JWT_EXPIRATION_HOURS),
             'iat': datetime.utcnow()
         }
 
@@ -65,7 +99,7 @@ class AuthService:
 
         try:
             user = UserRepository.create(user)
-            token = AuthService.generate_token(user.id)
+            token = AuthService.generate_token(user)
             return user, token
         except Exception as e:
             return None, f"Erro ao criar usuário: {str(e)}"
@@ -83,16 +117,124 @@ class AuthService:
         if not AuthService.verify_password(password, user.password_hash):
             return None, "Senha inválida"
         
-        token = AuthService.generate_token(user.id)
+        # Custo do bcrypt mudou: aproveita a senha em claro para regravar o hash
+        if AuthService.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = AuthService.hash_password(password)
+                UserRepository.update_password_hash(user.id, user.password_hash)
+                Metrics.incr('auth.rehashed')
+            except Exception as e:
+                print(f"⚠️ Erro ao atualizar hash do usuário {user.id}: {e}")
+        
+        token = AuthService.generate_token(user)
 
         return user, token
     
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _revoked_key(digest):
+        return f"auth:revoked:{digest}"
+
+    @staticmethod
+    def _user_version_key(user_id):
+        return f"auth:user_version:{user_id}"
+
+    @staticmethod
+    def _token_version(user_id):
+        value = get_shared_store().get(AuthService._user_version_key(user_id))
+        return int(value) if value is not None else 0
+
+    @staticmethod
+    def invalidate_user_tokens(user_id):
+        """
+        Marca os claims de todos os tokens do usuário como desatualizados
+        (chamado por UserRepository.update/delete)
+        """
+        get_shared_store().incr(AuthService._user_version_key(user_id))
+
+    @staticmethod
+    def _check(token):
+        """
+        Returns:
+            tuple: (claims ou None, claims_atuais) - `claims_atuais` é False
+            quando o usuário mudou ou foi excluído depois da emissão
+        """
+        digest = AuthService._digest(token)
+        payload = AuthService._verified_tokens.get(digest)
+
+        if payload is None:
+            Metrics.incr('auth.token_cache_misses')
+            payload = AuthService.verify_token(token)
+            if not payload:
+                return None, False
+
+            remaining = payload['exp'] - time.time()
+            AuthService._verified_tokens.set(
+                digest, payload, ttl=min(remaining, Config.AUTH_TOKEN_CACHE_TTL_SECONDS)
+            )
+        else:
+            Metrics.incr('auth.token_cache_hits')
+
+        # Revogação do token e versão do usuário numa ida só ao armazenamento
+        revoked, version = get_shared_store().mget([
+            AuthService._revoked_key(digest),
+            AuthService._user_version_key(payload.get('user_id'))
+        ])
+        if revoked is not None:
+            return None, False
+
+        current = int(version) if version is not None else 0
+        return payload, payload.get('ver', 0) == current
+
+    @staticmethod
+    def get_claims(token):
+        """
+        Claims de um token válido e não revogado
+
+        A verificação de assinatura fica em cache pelo digest do token; a
+        lista de revogação é consultada a cada chamada.
+        """
+        payload, _ = AuthService._check(token)
+        return payload
+
     @staticmethod
     def get_user_from_token(token):
-        payload = AuthService.verify_token(token)
+        """
+        Usuário do token, sem banco quando o token traz nome e email
+
+        Se o usuário foi alterado ou excluído depois da emissão (versão em
+        `auth:user_version:<id>`), ou se o token é antigo (só com user_id),
+        o usuário vem do UserRepository: renomeado recebe os dados novos,
+        excluído é recusado.
+        """
+        payload, current = AuthService._check(token)
         
         if not payload:
             return None
         
         user_id = payload.get('user_id')
+        if current and payload.get('name') is not None and payload.get('email') is not None:
+            return User(id=user_id, name=payload['name'], email=payload['email'])
+
         return UserRepository.find_by_id(user_id)
+
+    @staticmethod
+    def revoke_token(token):
+        """
+        Revoga um token até a expiração dele (logout)
+
+        Returns:
+            bool: False se o token já era inválido
+        """
+        payload = AuthService.verify_token(token)
+        if not payload:
+            return False
+
+        digest = AuthService._digest(token)
+        ttl = max(int(payload['exp'] - time.time()), 1)
+        get_shared_store().set(AuthService._revoked_key(digest), 1, ttl=ttl)
+        AuthService._verified_tokens.delete(digest)
+        return True
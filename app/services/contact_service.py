@@ -1,8 +1,77 @@
+from app.config import Config
 from app.repositories.contact_repository import ContactRepository
 from app.repositories.user_repository import UserRepository
 from app.models.contact import Contact
+from app.utils.cache import TTLCache
+from app.utils.metrics import Metrics
+from app.utils.shared_store import get_shared_store
 
 class ContactService:
+    # user_id -> (versão, lista de contatos com última mensagem)
+    # A versão fica no armazenamento compartilhado: uma escrita em qualquer
+    # worker invalida o cache de todos
+    _list_cache = TTLCache(
+        maxsize=Config.CONTACT_LIST_CACHE_SIZE,
+        ttl=Config.CONTACT_LIST_TTL_SECONDS
+    )
+
+    @staticmethod
+    def get_watcher_ids(user_id):
+        """Quem tem `user_id` como contato (grafo em memória)"""
+        return ContactRepository.find_watcher_ids(user_id)
+
+    @staticmethod
+    def get_contact_ids(user_id):
+        """Contatos de `user_id` (grafo em memória)"""
+        return ContactRepository.find_contact_user_ids(user_id)
+
+    @staticmethod
+    def get_contacts_presence(user_id, user_ids=None):
+        """
+        Presença dos contatos de `user_id` (todos ou só os `user_ids` pedidos)
+
+        IDs que não são contatos são ignorados para não expor presença a
+        estranhos.
+        """
+        from app.services.presence_service import PresenceService
+
+        contact_ids = ContactService.get_contact_ids(user_id)
+        if user_ids is None:
+            requested = contact_ids
+        else:
+            requested = [uid for uid in user_ids if uid in contact_ids]
+
+        return PresenceService.snapshot(requested)
+
+    @staticmethod
+    def _list_version_key(user_id):
+        return f"contacts:list_version:{user_id}"
+
+    @staticmethod
+    def invalidate_contact_list(*user_ids):
+        """Descarta a lista em cache (contatos mudaram ou chegou mensagem nova)"""
+        store = get_shared_store()
+        for user_id in set(user_ids):
+            store.incr(ContactService._list_version_key(user_id))
+            ContactService._list_cache.delete(user_id)
+
+    @staticmethod
+    def _patch_contact_list(user_id, patch):
+        """Aplica `patch(rows)` na lista em cache deste worker e invalida as demais"""
+        cached = ContactService._list_cache.get(user_id)
+        version = get_shared_store().incr(ContactService._list_version_key(user_id))
+
+        if cached is None:
+            return
+
+        # Só a versão imediatamente anterior ao incr garante que a lista local
+        # não perdeu uma escrita de outro worker; fora isso, descarta
+        previous = str(version - 1) if version > 1 else None
+        if cached[0] != previous:
+            ContactService._list_cache.delete(user_id)
+            return
+        ContactService._list_cache.set(user_id, (str(version), patch(cached[1])))
+
     @staticmethod
     def add_contact(user_id, contact_user_id, contact_name=None):
         if user_id == contact_user_id:
@@ -26,15 +95,107 @@ class ContactService:
 
         try:
             contact = ContactRepository.create(contact)
+            ContactService.invalidate_contact_list(user_id)
             return contact, None
         except Exception as e:
             return None, f"Erro ao adicionar contato: {str(e)}"
     
+    @staticmethod
+    def import_contacts(user_id, entries):
+        """
+        Adiciona em lote os usuários de uma agenda (lista de emails)
+
+        Args:
+            entries (list): Emails (str) ou objetos {'email', 'name'}; o
+                `name` (string não vazia, cortada em CONTACT_NAME_MAX_LENGTH)
+                vira o nome do contato, senão usa o nome do usuário
+
+        Returns:
+            tuple: (resultado, erro). resultado = {'added': [...],
+            'already_contacts': [emails], 'not_found': [emails],
+            'own_email': email do próprio usuário se estava na lista, senão None}
+        """
+        if not isinstance(entries, list) or not entries:
+            return None, "Lista de contatos vazia"
+        
+        if len(entries) > Config.CONTACT_IMPORT_MAX:
+            return None, f"Máximo de {Config.CONTACT_IMPORT_MAX} contatos por importação"
+        
+        # email normalizado -> nome informado na agenda
+        names = {}
+        for entry in entries:
+            if isinstance(entry, dict):
+                email, name = entry.get('email'), entry.get('name')
+            else:
+                email, name = entry, None
+            if not isinstance(email, str) or not email.strip():
+                continue
+            if isinstance(name, str) and name.strip():
+                name = name.strip()[:Config.CONTACT_NAME_MAX_LENGTH]
+            else:
+                name = None
+            names.setdefault(email.strip().lower(), name)
+        
+        try:
+            users = UserRepository.find_by_emails(names, Config.CONTACT_IMPORT_CHUNK_SIZE)
+            existing = ContactRepository.find_contact_user_ids(user_id)
+
+            found = {user.email.lower() for user in users}
+            already = []
+            new_contacts = []
+            own_email = None
+            for user in users:
+                if user.id == user_id:
+                    own_email = user.email
+                    continue
+                if user.id in existing:
+                    already.append(user.email)
+                    continue
+                existing.add(user.id)
+                new_contacts.append((user, Contact(
+                    user_id=user_id,
+                    contact_user_id=user.id,
+                    contact_name=names.get(user.email.lower()) or user.name
+                )))
+            
+            ContactRepository.create_many([contact for _, contact in new_contacts])
+        except Exception as e:
+            return None, f"Erro ao importar contatos: {str(e)}"
+        
+        if new_contacts:
+            ContactService.invalidate_contact_list(user_id)
+        
+        return {
+            'added': [
+                {
+                    'user_id': user.id,
+                    'name': user.name,
+                    'email': user.email,
+                    'contact_name': contact.contact_name
+                }
+                for user, contact in new_contacts
+            ],
+            'already_contacts': already,
+            'not_found': [email for email in names if email not in found],
+            'own_email': own_email
+        }, None
+    
     @staticmethod
     def get_user_contacts(user_id):
         try:
+            version = get_shared_store().get(ContactService._list_version_key(user_id))
+            version = str(version) if version is not None else None
+
+            cached = ContactService._list_cache.get(user_id)
+            if cached is not None and cached[0] == version:
+                Metrics.incr('contact_list_cache.hits')
+                return [dict(row) for row in cached[1]]
+
+            Metrics.incr('contact_list_cache.misses')
             contacts = ContactRepository.find_all_by_user(user_id)
-            return contacts
+            ContactService._list_cache.set(user_id, (version, contacts))
+            Metrics.gauge('contact_list_cache.size', len(ContactService._list_cache))
+            return [dict(row) for row in contacts]
         except Exception as e:
             print(f"Erro ao buscar contatos: {e}")
             return []
@@ -54,6 +215,10 @@ class ContactService:
         try:
             success = ContactRepository.update_contact_name(contact_id, new_name.strip())
             if success:
+                ContactService._patch_contact_list(user_id, lambda rows: [
+                    dict(row, contact_name=new_name.strip()) if row.get('contact_id') == contact_id else row
+                    for row in rows
+                ])
                 return True, None
             return False, "Erro ao atualizar contato"
         except Exception as e:
@@ -71,6 +236,9 @@ class ContactService:
         try:
             success = ContactRepository.delete(contact_id)
             if success:
+                ContactService._patch_contact_list(user_id, lambda rows: [
+                    row for row in rows if row.get('contact_id') != contact_id
+                ])
                 return True, None
             return False, "Erro ao remover contato"
         except Exception as e:
@@ -82,7 +250,10 @@ class ContactService:
             return []
         
         try:
-            users = UserRepository.search_by_email_or_name(search_term.strip(), user_id)
+            # Quem já é contato sai na mesma passada do índice
+            users = UserRepository.search_by_email_or_name(
+                search_term.strip(), user_id, ContactService.get_contact_ids(user_id)
+            )
             return [
                 {
                     'id': user.id,
@@ -0,0 +1,205 @@
+# app/services/message_pipeline.py
+
+from app.config import Config
+from app.services.message_service import MessageService
+from app.services.push_service import PushService
+from app.services.presence_service import PresenceService
+from app.utils.metrics import Metrics
+from app.utils.worker_pool import WorkerPool
+
+
+class MessagePipeline:
+    """
+    Fluxo único de envio de mensagens (REST e Socket.IO)
+
+    Estágios:
+        1. validate     - regras de negócio e destinatário
+        2. persist      - INSERT (deduplicado por client_id)
+        3. acknowledge  - confirmação ao remetente
+        4. fan_out      - eventos para a sala e para o destinatário
+        5. push         - Web Push se o destinatário estiver offline
+
+    Os estágios 1-3 rodam no request; 4 e 5 rodam no pool de workers.
+    Cada estágio é cronometrado em `pipeline.<estágio>`.
+    """
+
+    _socketio = None
+    _pool = None
+
+    @staticmethod
+    def init_app(socketio):
+        MessagePipeline._socketio = socketio
+        if MessagePipeline._pool is None:
+            MessagePipeline._pool = WorkerPool(
+                'pipeline',
+                max_workers=Config.PIPELINE_WORKERS,
+                max_pending=Config.PIPELINE_MAX_PENDING
+            )
+
+    @staticmethod
+    def serialize(message, sender, temp_id=None):
+        """Monta o payload enviado aos clientes"""
+        return {
+            'id': message.id,
+            'sender_id': message.sender_id,
+            'receiver_id': message.receiver_id,
+            'content': message.content,
+            'is_read': message.is_read,
+            'created_at': message.created_at.isoformat(),
+            'sender_name': sender.name,
+            'temp_id': temp_id
+        }
+
+    @staticmethod
+    def send(sender, receiver_id, content, temp_id=None, on_ack=None):
+        """
+        Executa o pipeline para uma mensagem
+
+        Args:
+            sender (User): Remetente
+            temp_id (str): Chave de idempotência do cliente
+            on_ack (callable): Recebe o payload da mensagem no estágio de
+                confirmação (ex.: emitir `message_confirmed` no socket)
+
+        Returns:
+            tuple: (message, error). Em retries, `message.is_duplicate` é
+            True e nada é reentregue.
+        """
+        with Metrics.timer('pipeline.validate'):
+            message = MessageService.find_duplicate(sender.id, temp_id)
+            if not message:
+                error = MessageService.validate_message(sender.id, receiver_id, content)
+                if error:
+                    return None, error
+
+        if not message:
+            with Metrics.timer('pipeline.persist'):
+                message, error = MessageService.persist_message(
+                    sender.id, receiver_id, content, temp_id
+                )
+            if error:
+                return None, error
+
+        message_data = MessagePipeline.serialize(message, sender, temp_id)
+
+        with Metrics.timer('pipeline.acknowledge'):
+            if on_ack:
+                on_ack(message_data)
+
+        if message.is_duplicate:
+            Metrics.incr('pipeline.duplicates')
+            print(f"♻️ Retry da mensagem {message.id} (temp_id={temp_id}) ignorado")
+            return message, None
+
+        MessagePipeline._pool.submit(MessagePipeline._deliver, message_data, sender)
+        return message, None
+
+    @staticmethod
+    def send_multicast(sender, receiver_ids, content, temp_id=None, on_ack=None):
+        """
+        Executa o pipeline para uma mensagem com vários destinatários
+
+        Returns:
+            tuple: (messages, invalid_ids, error)
+        """
+        with Metrics.timer('pipeline.persist_multicast'):
+            messages, invalid_ids, error = MessageService.send_multicast(
+                sender.id, receiver_ids, content, temp_id
+            )
+        if error:
+            return [], invalid_ids, error
+
+        messages_data = [
+            MessagePipeline.serialize(message, sender, temp_id) for message in messages
+        ]
+
+        with Metrics.timer('pipeline.acknowledge'):
+            if on_ack:
+                on_ack(messages_data, invalid_ids)
+
+        fresh = [
+            data for data, message in zip(messages_data, messages)
+            if not message.is_duplicate
+        ]
+        if fresh:
+            MessagePipeline._pool.submit(MessagePipeline._deliver_many, fresh, sender)
+        return messages, invalid_ids, None
+
+    @staticmethod
+    def _fan_out(message_data, sender):
+        """Emite a mensagem; retorna True se o destinatário estiver online"""
+        from app.sockets.outbound import Outbound
+
+        receiver_id = message_data['receiver_id']
+        receiver_online = PresenceService.is_online(receiver_id)
+
+        # Salas pessoais com seq: quem cair recebe o que perdeu ao reconectar
+        # (o remetente também, para sincronizar os outros dispositivos)
+        Outbound.emit_to_user(receiver_id, 'new_message', message_data)
+        Outbound.emit_to_user(sender.id, 'new_message', message_data)
+
+        # Destinatário online mas possivelmente em outra conversa
+        # (sala pessoal: todos os dispositivos)
+        if receiver_online:
+            Outbound.emit_user(receiver_id, 'message_notification', {
+                'message': message_data,
+                'from_user': {
+                    'id': sender.id,
+                    'name': sender.name
+                }
+            })
+
+        return receiver_online
+
+    @staticmethod
+    def _deliver(message_data, sender):
+        """Estágios pós-persistência (rodam fora do request)"""
+        receiver_id = message_data['receiver_id']
+
+        with Metrics.timer('pipeline.fan_out'):
+            receiver_online = MessagePipeline._fan_out(message_data, sender)
+
+        with Metrics.timer('pipeline.push'):
+            if receiver_online:
+                print(f"⚠️ Destinatário {receiver_id} está online, pulando push notification")
+            else:
+                try:
+                    print(f"📲 Destinatário {receiver_id} offline, enviando push...")
+                    PushService.send_message_notification(
+                        sender, receiver_id, message_data['content']
+                    )
+                except Exception as push_error:
+                    # ✅ NÃO propagar erro de push - mensagem já foi salva
+                    print(f"⚠️ Erro ao enviar push (não crítico): {push_error}")
+
+        print(f"✅ Mensagem {message_data['id']} enviada de {sender.id} para {receiver_id}")
+
+    @staticmethod
+    def _deliver_many(messages_data, sender):
+        """Fan-out de um multicast com um único lote de pushes"""
+        offline = []
+
+        with Metrics.timer('pipeline.fan_out'):
+            for message_data in messages_data:
+                if not MessagePipeline._fan_out(message_data, sender):
+                    offline.append(message_data)
+
+        with Metrics.timer('pipeline.push'):
+            try:
+                PushService.send_batch([
+                    {
+                        'user_id': message_data['receiver_id'],
+                        'title': f"💬 {sender.name}",
+                        'body': PushService.message_preview(message_data['content']),
+                        'data': {
+                            'type': 'message',
+                            'senderId': sender.id,
+                            'senderName': sender.name
+                        }
+                    }
+                    for message_data in offline
+                ])
+            except Exception as push_error:
+                print(f"⚠️ Erro ao enviar push (não crítico): {push_error}")
+
+        print(f"✅ Multicast de {sender.id} entregue a {len(messages_data)} destinatário(s)")
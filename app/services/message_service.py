@@ -1,36 +1,209 @@
+import copy
+import uuid
+from mysql.connector import errorcode, Error
+from app.config import Config
 from app.models.message import Message
 from app.repositories.message_repository import MessageRepository
 from app.repositories.user_repository import UserRepository
 from app.repositories.contact_repository import ContactRepository
+from app.services.contact_service import ContactService
+from app.services.receipt_service import ReceiptService
+from app.utils.cache import TTLCache
 
 class MessageService:
+    # (sender_id, client_id) -> Message já persistida
+    _sent_cache = TTLCache(
+        maxsize=Config.IDEMPOTENCY_CACHE_SIZE,
+        ttl=Config.IDEMPOTENCY_TTL_SECONDS
+    )
+
+    @staticmethod
+    def _as_duplicate(message):
+        duplicate = copy.copy(message)
+        duplicate.is_duplicate = True
+        return duplicate
+
+    @staticmethod
+    def _find_sent(sender_id, client_id):
+        """Procura um envio anterior com a mesma chave de idempotência"""
+        key = (sender_id, client_id)
+        message = MessageService._sent_cache.get(key)
+
+        if message is None:
+            message = MessageRepository.find_by_client_id(sender_id, client_id)
+            if message:
+                MessageService._sent_cache.set(key, message)
+
+        return MessageService._as_duplicate(message) if message else None
+
+    @staticmethod
+    def find_duplicate(sender_id, client_id):
+        """Retorna a mensagem já enviada com esta chave, se estiver no cache"""
+        if not client_id:
+            return None
+
+        cached = MessageService._sent_cache.get((sender_id, str(client_id)[:64]))
+        return MessageService._as_duplicate(cached) if cached else None
+
     @staticmethod
-    def send_message(sender_id, receiver_id, content):
+    def validate_message(sender_id, receiver_id, content):
+        """Retorna a mensagem de erro ou None se o envio for válido"""
         if not content or not content.strip():
-            return None, "A mensagem não pode estar vazia"
+            return "A mensagem não pode estar vazia"
         
         if len(content) > 5000:
-            return None, "A mensagem é muito longa (máximo 5000 caracteres)"
+            return "A mensagem é muito longa (máximo 5000 caracteres)"
         
         if sender_id == receiver_id:
-            return None, "Você não pode enviar mensagem para si mesmo"
+            return "Você não pode enviar mensagem para si mesmo"
         
         receiver = UserRepository.find_by_id(receiver_id)
         if not receiver:
-            return None, "Destinatário não encontrado"
+            return "Destinatário não encontrado"
         
+        return None
+
+    @staticmethod
+    def persist_message(sender_id, receiver_id, content, client_id=None):
+        """Grava uma mensagem já validada"""
+        if client_id:
+            client_id = str(client_id)[:64]
+
         message = Message(
             sender_id=sender_id,
             receiver_id=receiver_id,
             content=content.strip(),
-            is_read=False
+            is_read=False,
+            client_id=client_id
         )
         
         try:
             message = MessageRepository.create(message)
+            if client_id:
+                MessageService._sent_cache.set((sender_id, client_id), message)
+            # Última mensagem mudou na lista de contatos dos dois lados
+            ContactService.invalidate_contact_list(sender_id, receiver_id)
             return message, None
+        except Error as e:
+            # Retry concorrente: a UNIQUE (sender_id, client_id) já tem a mensagem
+            if client_id and e.errno == errorcode.ER_DUP_ENTRY:
+                original = MessageService._find_sent(sender_id, client_id)
+                if original:
+                    return original, None
+            return None, f"Erro ao enviar mensagem: {str(e)}"
         except Exception as e:
             return None, f"Erro ao enviar mensagem: {str(e)}"
+
+    @staticmethod
+    def send_message(sender_id, receiver_id, content, client_id=None):
+        """
+        Valida e salva uma nova mensagem
+
+        Args:
+            client_id (str): Chave de idempotência do cliente (temp_id). Um retry
+                com a mesma chave devolve a mensagem original, com
+                `is_duplicate = True`, sem novo INSERT.
+        """
+        duplicate = MessageService.find_duplicate(sender_id, client_id)
+        if duplicate:
+            return duplicate, None
+
+        error = MessageService.validate_message(sender_id, receiver_id, content)
+        if error:
+            return None, error
+
+        return MessageService.persist_message(sender_id, receiver_id, content, client_id)
+    
+    @staticmethod
+    def _apply_delivery_state(messages, user_id, contact_user_id):
+        """
+        Preenche `status` de cada linha a partir de is_read/delivered_at,
+        considerando também os recibos ainda não gravados pelo ReceiptService
+        """
+        pending = (
+            ReceiptService.pending_delivered(user_id, contact_user_id)
+            | ReceiptService.pending_delivered(contact_user_id, user_id)
+        )
+        read_by_contact = ReceiptService.pending_read(contact_user_id, user_id)
+
+        for row in messages:
+            is_read = row.get('is_read') or (
+                read_by_contact and row.get('sender_id') == user_id
+            )
+            delivered = row.get('delivered_at') or row.get('id') in pending
+            row['status'] = Message.status_of(is_read, delivered)
+
+        return messages
+
+    @staticmethod
+    def send_multicast(sender_id, receiver_ids, content, client_id=None):
+        """
+        Salva uma cópia da mensagem para cada destinatário
+
+        Destinatários são validados com uma única consulta IN e as cópias
+        inseridas com um único execute_many. Com `client_id`, um retry
+        devolve as cópias já gravadas (marcadas como duplicadas) e só
+        insere as que faltam.
+
+        Returns:
+            tuple: (messages, invalid_ids, error)
+        """
+        if not content or not content.strip():
+            return [], [], "A mensagem não pode estar vazia"
+        
+        if len(content) > 5000:
+            return [], [], "A mensagem é muito longa (máximo 5000 caracteres)"
+        
+        # Limite antes de percorrer a lista (vem direto do cliente)
+        if len(receiver_ids) > Config.MULTICAST_MAX_RECIPIENTS:
+            return [], [], f"Máximo de {Config.MULTICAST_MAX_RECIPIENTS} destinatários por envio"
+        
+        if any(not isinstance(rid, int) or isinstance(rid, bool) for rid in receiver_ids):
+            return [], [], "IDs de destinatários inválidos"
+        
+        # Sem repetição, na ordem recebida
+        unique_ids = [rid for rid in dict.fromkeys(receiver_ids) if rid != sender_id]
+        
+        if not unique_ids:
+            return [], [], "Nenhum destinatário válido"
+        
+        try:
+            existing = UserRepository.find_existing_ids(unique_ids)
+        except Exception as e:
+            return [], [], f"Erro ao validar destinatários: {str(e)}"
+        
+        invalid_ids = [rid for rid in unique_ids if rid not in existing]
+        valid_ids = [rid for rid in unique_ids if rid in existing]
+        
+        if not valid_ids:
+            return [], invalid_ids, "Destinatários não encontrados"
+        
+        base = str(client_id)[:40] if client_id else uuid.uuid4().hex
+        client_ids = {rid: f"{base}:{rid}" for rid in valid_ids}
+        
+        try:
+            duplicates = []
+            if client_id:
+                duplicates = [
+                    MessageService._as_duplicate(m)
+                    for m in MessageRepository.find_by_client_ids(sender_id, list(client_ids.values()))
+                ]
+            already_sent = {m.receiver_id for m in duplicates}
+            
+            created = MessageRepository.create_many([
+                Message(
+                    sender_id=sender_id,
+                    receiver_id=rid,
+                    content=content.strip(),
+                    is_read=False,
+                    client_id=client_ids[rid]
+                )
+                for rid in valid_ids if rid not in already_sent
+            ])
+            ContactService.invalidate_contact_list(sender_id, *(m.receiver_id for m in created))
+            return duplicates + created, invalid_ids, None
+        except Exception as e:
+            return [], invalid_ids, f"Erro ao enviar mensagem: {str(e)}"
     
     @staticmethod
     def get_conversation(user_id, contact_user_id, limit=50):
@@ -39,7 +212,7 @@ class MessageService:
             
             MessageRepository.mark_as_read(user_id, contact_user_id)
             
-            return messages
+            return MessageService._apply_delivery_state(messages, user_id, contact_user_id)
         except Exception as e:
             print(f"Erro ao buscar conversa: {e}")
             return []
@@ -82,6 +255,7 @@ class MessageService:
         try:
             success = MessageRepository.delete(message_id)
             if success:
+                ContactService.invalidate_contact_list(message.sender_id, message.receiver_id)
                 return True, None
             return False, "Erro ao deletar mensagem"
         except Exception as e:
@@ -95,6 +269,7 @@ class MessageService:
         
         try:
             count = MessageRepository.delete_conversation(user_id, contact_user_id)
+            ContactService.invalidate_contact_list(user_id, contact_user_id)
             return count, None
         except Exception as e:
             return 0, f"Erro ao deletar conversa: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,114 @@
+# app/services/presence_fanout.py
+
+import time
+import threading
+from app.config import Config
+from app.services.contact_service import ContactService
+from app.services.presence_service import PresenceService
+from app.utils.metrics import Metrics
+
+
+class PresenceFanout:
+    """
+    Entrega de mudanças de presença apenas aos contatos
+
+    Em vez de `broadcast=True` para todos os clientes, cada mudança vai só
+    para quem tem o usuário como contato (índice reverso em cache) e está
+    online. Mudanças dentro de PRESENCE_FANOUT_INTERVAL são agregadas: um
+    usuário que cai e volta na mesma janela não gera evento, e cada
+    destinatário recebe um único `presence_diff` por janela:
+
+        {"online": [{"user_id": 1, "name": "Ana"}],
+         "offline": [{"user_id": 2, "last_seen": 1700000000.0}]}
+    """
+
+    _lock = threading.Lock()
+    # user_id -> (online, info) - último estado na janela
+    _pending = {}
+    # user_id -> estado antes da primeira mudança da janela
+    _initial = {}
+    _socketio = None
+    _thread = None
+
+    @staticmethod
+    def init_app(socketio):
+        PresenceFanout._socketio = socketio
+        if PresenceFanout._thread is not None:
+            return
+
+        PresenceService.add_listener(PresenceFanout.record)
+        PresenceFanout._thread = threading.Thread(
+            target=PresenceFanout._run,
+            name='presence-fanout',
+            daemon=True
+        )
+        PresenceFanout._thread.start()
+
+    @staticmethod
+    def record(user_id, online, info):
+        with PresenceFanout._lock:
+            PresenceFanout._initial.setdefault(user_id, not online)
+            PresenceFanout._pending[user_id] = (online, info)
+
+    @staticmethod
+    def flush():
+        with PresenceFanout._lock:
+            pending = PresenceFanout._pending
+            initial = PresenceFanout._initial
+            PresenceFanout._pending = {}
+            PresenceFanout._initial = {}
+
+        # watcher_id -> {'online': [...], 'offline': [...]}
+        diffs = {}
+        for user_id, (online, info) in pending.items():
+            if initial.get(user_id) == online:
+                Metrics.incr('presence.coalesced')
+                continue
+
+            if online:
+                entry = ('online', {'user_id': user_id, 'name': info.get('name')})
+            else:
+                entry = ('offline', {'user_id': user_id, 'last_seen': info.get('last_seen')})
+
+            try:
+                watchers = ContactService.get_watcher_ids(user_id)
+            except Exception as e:
+                print(f"❌ Erro ao buscar contatos de {user_id}: {e}")
+                continue
+
+            for watcher_id in watchers:
+                if PresenceService.is_online(watcher_id):
+                    diff = diffs.setdefault(watcher_id, {'online': [], 'offline': []})
+                    diff[entry[0]].append(entry[1])
+
+        from app.sockets.outbound import Outbound
+        for watcher_id, diff in diffs.items():
+            # Sessões com fila cheia recebem um único diff agregado depois
+            Outbound.emit_coalesced(watcher_id, 'presence_diff', diff, PresenceFanout.merge)
+
+        Metrics.incr('presence.diffs_sent', len(diffs))
+
+    @staticmethod
+    def merge(previous, diff):
+        """Combina dois presence_diff; o estado mais recente de cada usuário vence"""
+        latest = {}
+        for state in ('online', 'offline'):
+            for entry in previous[state]:
+                latest[entry['user_id']] = (state, entry)
+        for state in ('online', 'offline'):
+            for entry in diff[state]:
+                latest[entry['user_id']] = (state, entry)
+
+        merged = {'online': [], 'offline': []}
+        for state, entry in latest.values():
+            merged[state].append(entry)
+        return merged
+
+    @staticmethod
+    def _run():
+        while True:
+            time.sleep(Config.PRESENCE_FANOUT_INTERVAL)
+            try:
+                PresenceFanout.flush()
+            except Exception as e:
+                print(f"❌ Erro ao enviar presence_diff: {e}")
@@ -0,0 +1,224 @@
+# app/services/presence_service.py
+
+import time
+import threading
+from app.config import Config
+from app.utils.metrics import Metrics
+from app.utils.shared_store import get_shared_store
+from app.utils.timer_wheel import TimerWheel
+
+
+class PresenceService:
+    """
+    Presença online/offline com heartbeat e expiração por TTL
+
+    Cada sessão tem um último sinal de vida renovado por `touch`: conexão,
+    qualquer evento recebido do cliente (inclusive `presence_ping`) e o
+    ping/pong do Engine.IO, que roda a cada `ping_interval` sem depender do
+    cliente. Os prazos ficam numa TimerWheel: a cada PRESENCE_TTL / 3 a
+    sessão é conferida; se o socket do Engine.IO ainda está aberto (o
+    próprio Engine.IO fecha quem perde o pong), a presença é renovada, senão
+    o usuário é marcado offline. O socket nunca é derrubado por aqui.
+
+    O estado "online" de cada usuário é uma chave com TTL no armazenamento
+    compartilhado (`presence:online:<id>`), então `is_online` é O(1) e
+    sessões fantasmas de um worker que morreu somem sozinhas.
+    """
+
+    _lock = threading.Lock()
+    _wheel = None
+    _thread = None
+    _socketio = None
+    # sid -> último touch gravado (evita uma escrita no store por evento)
+    _touched = {}
+    # callback(user_id, online, info) chamado quando o usuário entra/sai
+    _listeners = []
+
+    @staticmethod
+    def init_app(socketio):
+        PresenceService._socketio = socketio
+        if PresenceService._thread is not None:
+            return
+
+        PresenceService._wheel = TimerWheel(tick=1.0, slots=64, levels=2)
+        PresenceService._thread = threading.Thread(
+            target=PresenceService._run,
+            name='presence-sweeper',
+            daemon=True
+        )
+        PresenceService._thread.start()
+
+    @staticmethod
+    def add_listener(callback):
+        PresenceService._listeners.append(callback)
+
+    @staticmethod
+    def _notify(user_id, online, info):
+        for callback in PresenceService._listeners:
+            try:
+                callback(user_id, online, info)
+            except Exception as e:
+                print(f"❌ Erro ao notificar presença de {user_id}: {e}")
+
+    @staticmethod
+    def _online_key(user_id):
+        return f"presence:online:{user_id}"
+
+    @staticmethod
+    def _last_seen_key(user_id):
+        return f"presence:last_seen:{user_id}"
+
+    @staticmethod
+    def connect(sid, user_id, name=None, device=None, codec='json'):
+        """
+        Registra uma sessão e renova a presença do usuário
+
+        Returns:
+            bool: True se o usuário estava offline
+        """
+        from app.sockets import sessions
+
+        # Contagem atômica no store: só uma das conexões simultâneas vê a transição
+        came_online = sessions.add(sid, user_id, name, device, codec)
+        PresenceService.touch(sid)
+
+        if came_online:
+            PresenceService._notify(user_id, True, {'name': name, 'sid': sid})
+        return came_online
+
+    @staticmethod
+    def _check_interval():
+        return Config.PRESENCE_TTL / 3
+
+    @staticmethod
+    def touch(sid, force=False):
+        """
+        Heartbeat: renova o prazo da sessão e o estado online do usuário
+
+        Chamadas dentro de PRESENCE_TTL / 3 do último touch são ignoradas,
+        a menos que `force`.
+        """
+        from app.sockets import sessions
+
+        now = time.time()
+        last = PresenceService._touched.get(sid)
+        if not force and last is not None and now - last < PresenceService._check_interval():
+            return
+
+        user_id = sessions.user_for(sid)
+        if user_id is None:
+            return
+        sessions.refresh(sid)
+
+        with PresenceService._lock:
+            PresenceService._touched[sid] = now
+            if PresenceService._wheel is not None:
+                PresenceService._wheel.schedule(sid, now + PresenceService._check_interval())
+
+        store = get_shared_store()
+        store.set(PresenceService._online_key(user_id), now, ttl=Config.PRESENCE_TTL)
+        store.set(PresenceService._last_seen_key(user_id), now)
+
+    @staticmethod
+    def disconnect(sid):
+        """
+        Remove uma sessão
+
+        Returns:
+            tuple: (user_id, went_offline)
+        """
+        from app.sockets import sessions
+
+        with PresenceService._lock:
+            PresenceService._touched.pop(sid, None)
+            if PresenceService._wheel is not None:
+                PresenceService._wheel.cancel(sid)
+
+        user_id, last_session = sessions.remove(sid)
+        if user_id is None:
+            return None, False
+
+        store = get_shared_store()
+        now = time.time()
+        store.set(PresenceService._last_seen_key(user_id), now)
+
+        if last_session:
+            store.delete(PresenceService._online_key(user_id))
+            PresenceService._notify(user_id, False, {'last_seen': now})
+        return user_id, last_session
+
+    @staticmethod
+    def is_online(user_id):
+        return get_shared_store().get(PresenceService._online_key(user_id)) is not None
+
+    @staticmethod
+    def last_seen(user_id):
+        value = get_shared_store().get(PresenceService._last_seen_key(user_id))
+        return float(value) if value is not None else None
+
+    @staticmethod
+    def snapshot(user_ids):
+        """
+        Estado de presença de vários usuários (sem acessar o banco)
+
+        Returns:
+            dict: user_id -> {'online': bool, 'last_seen': epoch ou None}
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        store = get_shared_store()
+        values = store.mget(
+            [PresenceService._online_key(uid) for uid in user_ids]
+            + [PresenceService._last_seen_key(uid) for uid in user_ids]
+        )
+        online, last_seen = values[:len(user_ids)], values[len(user_ids):]
+
+        return {
+            uid: {
+                'online': online[i] is not None,
+                'last_seen': float(last_seen[i]) if last_seen[i] is not None else None
+            }
+            for i, uid in enumerate(user_ids)
+        }
+
+    @staticmethod
+    def _transport_alive(sid):
+        """True se o socket do Engine.IO da sessão segue aberto neste worker"""
+        try:
+            server = PresenceService._socketio.server
+            eio_sid = server.manager.eio_sid_from_sid(sid, '/')
+            socket = server.eio.sockets.get(eio_sid)
+        except Exception:
+            return False
+
+        return socket is not None and not socket.closing and not socket.closed
+
+    @staticmethod
+    def _expire(sid):
+        """
+        Prazo da sessão venceu: renova se o ping/pong do Engine.IO segue em
+        dia, senão marca o usuário offline (sem derrubar o socket)
+        """
+        if PresenceService._transport_alive(sid):
+            PresenceService.touch(sid, force=True)
+            return
+
+        user_id, _ = PresenceService.disconnect(sid)
+        if user_id is None:
+            return
+
+        Metrics.incr('presence.expired')
+        print(f"⌛ Sessão {sid} do usuário {user_id} expirou sem heartbeat")
+
+    @staticmethod
+    def _run():
+        while True:
+            time.sleep(1.0)
+
+            with PresenceService._lock:
+                expired = PresenceService._wheel.advance(time.time())
+
+            for sid, _ in expired:
+                PresenceService._expire(sid)
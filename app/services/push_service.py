@@ -254,6 +254,107 @@ class PushService:
             print(f"❌ Erro ao remover subscription: {e}")
             return False
     
+    @staticmethod
+    def _build_payload(title, body, data=None, icon=None, badge=None):
+        """Monta o JSON da notificação"""
+        payload = {
+            'title': title,
+            'body': body,
+            'icon': icon or '/assets/icons/icon-192.png',
+            'badge': badge or '/assets/icons/icon-192.png',
+            'data': data or {}
+        }
+        return json.dumps(payload)
+    
+    @staticmethod
+    def _get_claim_email():
+        """Valida VAPID_CLAIM_EMAIL"""
+        claim_email = Config.VAPID_CLAIM_EMAIL
+        if not claim_email:
+            claim_email = 'mailto:admin@mychat.com'
+            print(f"⚠️ VAPID_CLAIM_EMAIL não configurado, usando padrão: {claim_email}")
+        
+        if not claim_email.startswith('mailto:'):
+            claim_email = f'mailto:{claim_email}'
+        
+        return claim_email
+    
+    @staticmethod
+    def _send_to_subscription(client, sub, payload_json, claim_email, ignore_errors=False):
+        """
+        Envia um payload para uma subscription usando o cliente httpx informado
+        
+        Returns:
+            bool: True se o push service aceitou a notificação
+        """
+        try:
+            endpoint = sub['endpoint']
+            p256dh = sub['p256dh']
+            auth = sub['auth']
+            
+            print(f"   Endpoint: {endpoint[:60]}...")
+            print(f"   p256dh: {p256dh[:20]}...")
+            print(f"   auth: {auth[:20]}...")
+            
+            # ✅ CRIPTOGRAFAR PAYLOAD
+            encrypted_payload = PushService._encrypt_payload(
+                payload_json,
+                p256dh,
+                auth
+            )
+            
+            # Gerar headers VAPID
+            vapid_headers = PushService._generate_vapid_headers(
+                endpoint,
+                {'sub': claim_email}
+            )
+            
+            # Headers completos
+            headers = {
+                **vapid_headers,
+                'Content-Type': 'application/octet-stream',
+                'Content-Encoding': 'aes128gcm',
+                'TTL': '86400'
+            }
+            
+            print(f"📋 Headers:")
+            for k, v in headers.items():
+                print(f"   {k}: {v[:80] if len(str(v)) > 80 else v}")
+            
+            # ✅ ENVIAR PUSH COM PAYLOAD CRIPTOGRAFADO
+            response = client.post(
+                endpoint,
+                content=encrypted_payload,
+                headers=headers
+            )
+            
+            print(f"📬 Response: {response.status_code}")
+            
+            if response.status_code in [200, 201]:
+                print(f"✅ Push enviado com sucesso!")
+                return True
+            elif response.status_code in [404, 410]:
+                print(f"🗑️ Subscription expirada (410/404), removendo...")
+                PushRepository.delete_subscription(sub['user_id'], endpoint)
+            elif response.status_code in [401, 403] and not ignore_errors:
+                # VAPID key mismatch - subscription inválida
+                print(f"🗑️ Subscription com chave inválida (401/403), removendo...")
+                PushRepository.delete_subscription(sub['user_id'], endpoint)
+            else:
+                print(f"⚠️ Status {response.status_code}")
+                print(f"   Response: {response.text[:300]}")
+            
+        except httpx.HTTPError as e:
+            print(f"❌ Erro HTTP ao enviar push: {e}")
+        except Exception as e:
+            print(f"❌ Erro inesperado ao enviar push:")
+            print(f"   Type: {type(e).__name__}")
+            print(f"   Message: {str(e)}")
+            import traceback
+            traceback.print_exc()
+        
+        return False
+    
     @staticmethod
     def send_notification(user_id, title, body, data=None, icon=None, badge=None, ignore_errors=False):
         """
@@ -270,27 +371,13 @@ class PushService:
                 return False
             
             # Preparar payload
-            payload = {
-                'title': title,
-                'body': body,
-                'icon': icon or '/assets/icons/icon-192.png',
-                'badge': badge or '/assets/icons/icon-192.png',
-                'data': data or {}
-            }
-            
-            payload_json = json.dumps(payload)
+            payload_json = PushService._build_payload(title, body, data, icon, badge)
             print(f"📦 Payload JSON ({len(payload_json)} chars): {payload_json[:100]}...")
             
             success_count = 0
             
             # Validar VAPID_CLAIM_EMAIL
-            claim_email = Config.VAPID_CLAIM_EMAIL
-            if not claim_email:
-                claim_email = 'mailto:admin@mychat.com'
-                print(f"⚠️ VAPID_CLAIM_EMAIL não configurado, usando padrão: {claim_email}")
-            
-            if not claim_email.startswith('mailto:'):
-                claim_email = f'mailto:{claim_email}'
+            claim_email = PushService._get_claim_email()
             
             print(f"📧 Usando VAPID claim email: {claim_email}")
             print(f"📤 Enviando push para {len(subscriptions)} subscription(s)")
@@ -298,72 +385,11 @@ class PushService:
             # Criar cliente httpx
             with httpx.Client(timeout=10.0) as client:
                 for i, sub in enumerate(subscriptions, 1):
-                    try:
-                        endpoint = sub['endpoint']
-                        p256dh = sub['p256dh']
-                        auth = sub['auth']
-                        
-                        print(f"\n📨 Subscription {i}/{len(subscriptions)}")
-                        print(f"   Endpoint: {endpoint[:60]}...")
-                        print(f"   p256dh: {p256dh[:20]}...")
-                        print(f"   auth: {auth[:20]}...")
-                        
-                        # ✅ CRIPTOGRAFAR PAYLOAD
-                        encrypted_payload = PushService._encrypt_payload(
-                            payload_json,
-                            p256dh,
-                            auth
-                        )
-                        
-                        # Gerar headers VAPID
-                        vapid_headers = PushService._generate_vapid_headers(
-                            endpoint,
-                            {'sub': claim_email}
-                        )
-                        
-                        # Headers completos
-                        headers = {
-                            **vapid_headers,
-                            'Content-Type': 'application/octet-stream',
-                            'Content-Encoding': 'aes128gcm',
-                            'TTL': '86400'
-                        }
-                        
-                        print(f"📋 Headers:")
-                        for k, v in headers.items():
-                            print(f"   {k}: {v[:80] if len(str(v)) > 80 else v}")
-                        
-                        # ✅ ENVIAR PUSH COM PAYLOAD CRIPTOGRAFADO
-                        response = client.post(
-                            endpoint,
-                            content=encrypted_payload,
-                            headers=headers
-                        )
-                        
-                        print(f"📬 Response: {response.status_code}")
-                        
-                        if response.status_code in [200, 201]:
-                            success_count += 1
-                            print(f"✅ Push enviado com sucesso!")
-                        elif response.status_code in [404, 410]:
-                            print(f"🗑️ Subscription expirada (410/404), removendo...")
-                            PushRepository.delete_subscription(user_id, endpoint)
-                        elif response.status_code in [401, 403] and not ignore_errors:
-                            # VAPID key mismatch - subscription inválida
-                            print(f"🗑️ Subscription com chave inválida (401/403), removendo...")
-                            PushRepository.delete_subscription(user_id, endpoint)
-                        else:
-                            print(f"⚠️ Status {response.status_code}")
-                            print(f"   Response: {response.text[:300]}")
-                        
-                    except httpx.HTTPError as e:
-                        print(f"❌ Erro HTTP ao enviar push: {e}")
-                    except Exception as e:
-                        print(f"❌ Erro inesperado ao enviar push:")
-                        print(f"   Type: {type(e).__name__}")
-                        print(f"   Message: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
+                    print(f"\n📨 Subscription {i}/{len(subscriptions)}")
+                    if PushService._send_to_subscription(
+                        client, sub, payload_json, claim_email, ignore_errors
+                    ):
+                        success_count += 1
             
             print(f"\n📊 Resultado: {success_count}/{len(subscriptions)} enviados com sucesso")
             
@@ -375,6 +401,64 @@ class PushService:
             traceback.print_exc()
             return False
     
+    @staticmethod
+    def send_batch(notifications):
+        """
+        Envia várias notificações com uma única consulta de subscriptions
+        e um único cliente httpx
+        
+        Args:
+            notifications (list): Dicts com user_id, title, body e data (opcional)
+        
+        Returns:
+            int: Número de pushes aceitos
+        """
+        if not notifications:
+            return 0
+        
+        try:
+            user_ids = list({n['user_id'] for n in notifications})
+            subscriptions = PushRepository.find_by_user_ids(user_ids) or []
+            
+            by_user = {}
+            for sub in subscriptions:
+                by_user.setdefault(sub['user_id'], []).append(sub)
+            
+            claim_email = PushService._get_claim_email()
+            success_count = 0
+            
+            print(f"📤 Enviando {len(notifications)} push(es) em lote para {len(by_user)} usuário(s)")
+            
+            with httpx.Client(timeout=10.0) as client:
+                for notification in notifications:
+                    payload_json = PushService._build_payload(
+                        notification['title'],
+                        notification['body'],
+                        notification.get('data')
+                    )
+                    for sub in by_user.get(notification['user_id'], []):
+                        if PushService._send_to_subscription(
+                            client, sub, payload_json, claim_email
+                        ):
+                            success_count += 1
+            
+            print(f"📊 Resultado do lote: {success_count} enviados com sucesso")
+            return success_count
+            
+        except Exception as e:
+            print(f"❌ Erro ao enviar lote de notificações: {e}")
+            import traceback
+            traceback.print_exc()
+            return 0
+    
+    @staticmethod
+    def message_preview(message_content):
+        """Primeiros 100 caracteres da mensagem para o corpo do push"""
+        preview = message_content[:100]
+        if len(message_content) > 100:
+            preview += '...'
+        return preview
+    
     @staticmethod
     def send_message_notification(sender_user, receiver_user_id, message_content):
         """
@@ -395,9 +479,7 @@ class PushService:
         try:
             PushService._processing[notification_key] = current_time
             
-            preview = message_content[:100]
-            if len(message_content) > 100:
-                preview += '...'
+            preview = PushService.message_preview(message_content)
             
             result = PushService.send_notification(
                 user_id=receiver_user_id,
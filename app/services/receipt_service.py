@@ -0,0 +1,134 @@
+# app/services/receipt_service.py
+
+import atexit
+import threading
+from datetime import datetime
+from app.config import Config
+from app.repositories.message_repository import MessageRepository
+from app.utils.metrics import Metrics
+
+
+class ReceiptService:
+    """
+    Agregador de recibos de entrega/leitura
+
+    Os eventos `message_delivered` e `message_read` de todos os sockets são
+    acumulados em memória e gravados periodicamente com `execute_many`,
+    em vez de um UPDATE por evento. Recibos repetidos para a mesma mensagem
+    (ou par de usuários) são coalescidos antes da gravação.
+    """
+
+    _lock = threading.Lock()
+    # message_id -> (receiver_id, sender_id, delivered_at)
+    _delivered = {}
+    # (receiver_id, sender_id) -> {message_id} (índice de _delivered)
+    _delivered_by_pair = {}
+    # (receiver_id, sender_id) -> (read_at, limite por data, limite por id)
+    _read = {}
+    _wakeup = threading.Event()
+    _thread = None
+
+    @staticmethod
+    def start():
+        """Inicia a thread de gravação periódica"""
+        if ReceiptService._thread is not None:
+            return
+
+        ReceiptService._thread = threading.Thread(
+            target=ReceiptService._run,
+            name='receipt-flusher',
+            daemon=True
+        )
+        ReceiptService._thread.start()
+        atexit.register(ReceiptService.flush)
+
+    @staticmethod
+    def record_delivered(receiver_id, sender_id, message_ids):
+        now = datetime.now()
+
+        with ReceiptService._lock:
+            pair = ReceiptService._delivered_by_pair.setdefault((receiver_id, sender_id), set())
+            for message_id in message_ids:
+                ReceiptService._delivered.setdefault(
+                    message_id, (receiver_id, sender_id, now)
+                )
+                pair.add(message_id)
+            pending = len(ReceiptService._delivered)
+
+        Metrics.incr('receipts.delivered', len(message_ids))
+        if pending >= Config.RECEIPT_MAX_BATCH:
+            ReceiptService._wakeup.set()
+
+    @staticmethod
+    def record_read(receiver_id, sender_id, last_message_id=None):
+        """
+        Leitura da conversa até agora (ou até `last_message_id`)
+
+        O limite é fixado aqui, no recebimento do recibo: mensagens que
+        chegarem antes da gravação em lote continuam não lidas.
+        """
+        key = (receiver_id, sender_id)
+        now = datetime.now()
+
+        with ReceiptService._lock:
+            _, read_until, read_up_to_id = ReceiptService._read.get(key, (None, None, None))
+            if last_message_id is None:
+                read_until = now
+            else:
+                read_up_to_id = max(read_up_to_id or 0, last_message_id)
+            ReceiptService._read[key] = (now, read_until, read_up_to_id)
+
+        Metrics.incr('receipts.read')
+
+    @staticmethod
+    def pending_delivered(receiver_id, sender_id):
+        """IDs ainda não gravados entregues de `sender_id` para `receiver_id`"""
+        with ReceiptService._lock:
+            return set(ReceiptService._delivered_by_pair.get((receiver_id, sender_id), ()))
+
+    @staticmethod
+    def pending_read(receiver_id, sender_id):
+        with ReceiptService._lock:
+            return (receiver_id, sender_id) in ReceiptService._read
+
+    @staticmethod
+    def flush():
+        """Grava todos os recibos pendentes"""
+        with ReceiptService._lock:
+            delivered = ReceiptService._delivered
+            read = ReceiptService._read
+            ReceiptService._delivered = {}
+            ReceiptService._delivered_by_pair = {}
+            ReceiptService._read = {}
+
+        if not delivered and not read:
+            return
+
+        try:
+            with Metrics.timer('receipts.flush'):
+                if delivered:
+                    MessageRepository.mark_many_delivered([
+                        (delivered_at, message_id, receiver_id)
+                        for message_id, (receiver_id, _, delivered_at) in delivered.items()
+                    ])
+                if read:
+                    MessageRepository.mark_many_read([
+                        (read_at, receiver_id, sender_id, read_until, read_up_to_id)
+                        for (receiver_id, sender_id), (read_at, read_until, read_up_to_id) in read.items()
+                    ])
+        except Exception as e:
+            # Devolver ao buffer para a próxima tentativa
+            print(f"❌ Erro ao gravar recibos: {e}")
+            with ReceiptService._lock:
+                for key, value in delivered.items():
+                    ReceiptService._delivered.setdefault(key, value)
+                    ReceiptService._delivered_by_pair.setdefault(value[:2], set()).add(key)
+                for key, value in read.items():
+                    ReceiptService._read.setdefault(key, value)
+
+    @staticmethod
+    def _run():
+        while True:
+            ReceiptService._wakeup.wait(Config.RECEIPT_FLUSH_INTERVAL)
+            ReceiptService._wakeup.clear()
+            ReceiptService.flush()
@@ -0,0 +1,256 @@
+# app/services/schedule_service.py
+
+import time
+import threading
+from datetime import datetime
+from mysql.connector import errorcode, Error
+from app.config import Config
+from app.models.scheduled_message import ScheduledMessage
+from app.repositories.scheduled_message_repository import ScheduledMessageRepository
+from app.repositories.user_repository import UserRepository
+from app.services.message_service import MessageService
+from app.services.message_pipeline import MessagePipeline
+from app.services.presence_service import PresenceService
+from app.utils.metrics import Metrics
+from app.utils.timer_wheel import TimerWheel
+
+
+class ScheduleService:
+    """
+    Envio de mensagens agendadas
+
+    A tabela `scheduled_messages` é a fonte da verdade (sobrevive a
+    restarts). Só os agendamentos que vencem dentro da janela
+    `SCHEDULER_LOAD_WINDOW` ficam em memória, numa TimerWheel; a janela
+    avança com consultas por faixa de `send_at` no índice
+    (status, send_at), nunca varrendo a tabela inteira.
+
+    No vencimento, a linha é reivindicada atomicamente (pending -> sending)
+    antes do envio: só um processo envia, e um cancelamento feito em
+    qualquer worker vale para todos. A mensagem passa pelo MessagePipeline
+    normal (persist, fan-out e push) com `temp_id = scheduled:<id>`, então
+    reenviar uma reivindicação órfã (processo caiu no meio, devolvida após
+    SCHEDULER_CLAIM_TIMEOUT) não duplica a mensagem.
+
+    Cada carga de janela também relê os pendentes já vencidos: cobre
+    despachos que falharam antes da reivindicação e agendamentos que só
+    estavam na roda de um worker que caiu. A reivindicação evita envio
+    duplicado quando mais de um worker pega a mesma linha.
+
+    `client_id` (temp_id / Idempotency-Key) torna o próprio agendamento
+    idempotente: repetir a requisição devolve o agendamento já criado.
+    """
+
+    _lock = threading.Lock()
+    _wheel = None
+    _loaded_until = 0.0
+    _socketio = None
+    _thread = None
+
+    @staticmethod
+    def init_app(socketio):
+        ScheduleService._socketio = socketio
+        if ScheduleService._thread is not None:
+            return
+
+        ScheduleService._wheel = TimerWheel(tick=Config.SCHEDULER_TICK)
+        ScheduleService._thread = threading.Thread(
+            target=ScheduleService._run,
+            name='message-scheduler',
+            daemon=True
+        )
+        ScheduleService._thread.start()
+
+    @staticmethod
+    def parse_send_at(value):
+        """
+        Converte `send_at` (ISO 8601 ou epoch em milissegundos) para datetime local
+
+        Raises:
+            ValueError: Formato inválido
+        """
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value / 1000)
+
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = datetime.fromtimestamp(parsed.timestamp())
+        return parsed
+
+    @staticmethod
+    def schedule(sender_id, receiver_id, content, send_at, client_id=None):
+        """
+        Agenda uma mensagem
+
+        Returns:
+            tuple: (ScheduledMessage, error)
+        """
+        if client_id:
+            client_id = str(client_id)[:64]
+            existing = ScheduledMessageRepository.find_by_client_id(sender_id, client_id)
+            if existing:
+                return existing, None
+
+        try:
+            send_at = ScheduleService.parse_send_at(send_at)
+        except (TypeError, ValueError):
+            return None, "Data de envio inválida"
+
+        if send_at.timestamp() <= time.time():
+            return None, "A data de envio deve estar no futuro"
+
+        error = MessageService.validate_message(sender_id, receiver_id, content)
+        if error:
+            return None, error
+
+        scheduled = ScheduledMessage(
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+            content=content.strip(),
+            send_at=send_at.replace(microsecond=0),
+            client_id=client_id
+        )
+
+        try:
+            scheduled = ScheduledMessageRepository.create(scheduled)
+        except Error as e:
+            # Retry concorrente: a UNIQUE (sender_id, client_id) já tem o agendamento
+            if client_id and e.errno == errorcode.ER_DUP_ENTRY:
+                existing = ScheduledMessageRepository.find_by_client_id(sender_id, client_id)
+                if existing:
+                    return existing, None
+            return None, f"Erro ao agendar mensagem: {str(e)}"
+        except Exception as e:
+            return None, f"Erro ao agendar mensagem: {str(e)}"
+
+        # Dentro da janela já carregada: entra direto na roda
+        with ScheduleService._lock:
+            if ScheduleService._wheel and send_at.timestamp() < ScheduleService._loaded_until:
+                ScheduleService._wheel.schedule(scheduled.id, send_at.timestamp(), scheduled)
+
+        Metrics.incr('scheduler.scheduled')
+        return scheduled, None
+
+    @staticmethod
+    def get_pending(sender_id):
+        try:
+            return ScheduledMessageRepository.find_pending_by_sender(sender_id)
+        except Exception as e:
+            print(f"Erro ao buscar mensagens agendadas: {e}")
+            return []
+
+    @staticmethod
+    def cancel(scheduled_id, sender_id):
+        try:
+            if not ScheduledMessageRepository.cancel(scheduled_id, sender_id):
+                return False, "Agendamento não encontrado"
+        except Exception as e:
+            return False, f"Erro ao cancelar agendamento: {str(e)}"
+
+        with ScheduleService._lock:
+            if ScheduleService._wheel:
+                ScheduleService._wheel.cancel(scheduled_id)
+        return True, None
+
+    @staticmethod
+    def _load_window(now):
+        """Carrega na roda os agendamentos que vencem até now + janela"""
+        until = now + Config.SCHEDULER_LOAD_WINDOW
+
+        # A janela é marcada antes da consulta: agendamentos criados durante
+        # a carga entram direto na roda (schedule é idempotente por id)
+        with ScheduleService._lock:
+            start = ScheduleService._loaded_until
+            ScheduleService._loaded_until = until
+
+        try:
+            # Reivindicações órfãs voltam a 'pending' com send_at já passado
+            ScheduledMessageRepository.release_stale(Config.SCHEDULER_CLAIM_TIMEOUT)
+            if start:
+                # Vencidos que ainda estão pendentes (despacho que falhou, roda
+                # de outro worker que caiu) + a próxima faixa da janela
+                rows = ScheduledMessageRepository.find_pending_before(datetime.fromtimestamp(start))
+                rows += ScheduledMessageRepository.find_pending_between(
+                    datetime.fromtimestamp(start), datetime.fromtimestamp(until)
+                )
+            else:
+                # Primeira carga (inclui atrasados de antes de um restart)
+                rows = ScheduledMessageRepository.find_pending_before(datetime.fromtimestamp(until))
+        except Exception:
+            with ScheduleService._lock:
+                ScheduleService._loaded_until = start
+            raise
+
+        with ScheduleService._lock:
+            for scheduled in rows:
+                ScheduleService._wheel.schedule(
+                    scheduled.id, scheduled.send_at.timestamp(), scheduled
+                )
+
+        Metrics.gauge('scheduler.in_wheel', len(ScheduleService._wheel))
+
+    @staticmethod
+    def _dispatch(scheduled):
+        # Cancelado, já enviado ou reivindicado por outro processo
+        if not ScheduledMessageRepository.claim(scheduled.id):
+            Metrics.incr('scheduler.skipped')
+            return
+
+        sender = UserRepository.find_by_id(scheduled.sender_id)
+        if not sender:
+            ScheduledMessageRepository.mark_failed(scheduled.id)
+            return
+
+        message, error = MessagePipeline.send(
+            sender,
+            scheduled.receiver_id,
+            scheduled.content,
+            temp_id=f"scheduled:{scheduled.id}"
+        )
+
+        if error:
+            print(f"❌ Falha ao enviar mensagem agendada {scheduled.id}: {error}")
+            ScheduledMessageRepository.mark_failed(scheduled.id)
+            Metrics.incr('scheduler.failed')
+            return
+
+        ScheduledMessageRepository.mark_sent(scheduled.id, message.id)
+        Metrics.incr('scheduler.sent')
+
+        from app.sockets.outbound import Outbound
+        if PresenceService.is_online(sender.id):
+            Outbound.emit_user(sender.id, 'scheduled_message_sent', {
+                'scheduled_id': scheduled.id,
+                'message': MessagePipeline.serialize(message, sender)
+            })
+
+    @staticmethod
+    def _run():
+        while True:
+            now = time.time()
+
+            try:
+                if now + Config.SCHEDULER_LOAD_WINDOW / 2 >= ScheduleService._loaded_until:
+                    ScheduleService._load_window(now)
+            except Exception as e:
+                print(f"❌ Erro ao carregar mensagens agendadas: {e}")
+
+            with ScheduleService._lock:
+                due = ScheduleService._wheel.advance(now)
+
+            for _, scheduled in due:
+                try:
+                    with Metrics.timer('scheduler.dispatch'):
+                        ScheduleService._dispatch(scheduled)
+                except Exception as e:
+                    print(f"❌ Erro ao despachar mensagem agendada {scheduled.id}: {e}")
+                    # Erro transitório (ex.: banco): tenta de novo em breve.
+                    # Se já tinha sido reivindicada, a nova tentativa é ignorada
+                    # e a linha volta por release_stale
+                    Metrics.incr('scheduler.retried')
+                    with ScheduleService._lock:
+                        ScheduleService._wheel.schedule(
+                            scheduled.id, time.time() + Config.SCHEDULER_RETRY_DELAY, scheduled
+                        )
+
+            time.sleep(Config.SCHEDULER_TICK)
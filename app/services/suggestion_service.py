@@ -0,0 +1,134 @@
+import time
+from datetime import datetime
+from app.config import Config
+from app.repositories.suggestion_repository import SuggestionRepository
+from app.services.contact_service import ContactService
+from app.utils.metrics import Metrics
+
+
+class SuggestionService:
+    """
+    "Pessoas que você talvez conheça", ranqueadas por contatos em comum
+
+    O cálculo roda em lote (`flask compute-suggestions`, agendado no
+    Render) e grava o resultado na tabela `contact_suggestions`; o
+    endpoint só lê essa tabela.
+
+    Com A a matriz de adjacência de `contacts` (esparsa, n x n) e
+    S = A + Aᵀ (qualquer direção conta como vínculo), S·S[u, v] é o número
+    de pessoas ligadas a u e a v. Descarta-se a diagonal e quem u já tem
+    como contato (máscara A[u, v]) e ficam os CONTACT_SUGGESTIONS_PER_USER
+    maiores de cada linha. O produto é feito em blocos de
+    CONTACT_SUGGESTIONS_BLOCK_SIZE linhas para limitar a memória.
+    """
+
+    @staticmethod
+    def score(edges, per_user=20, min_mutual=1, block_size=2000):
+        """
+        Args:
+            edges (list): Pares (user_id, contact_user_id)
+
+        Yields:
+            tuple: (user_id, suggested_user_id, mutual_count)
+        """
+        import numpy as np
+        from scipy import sparse
+
+        if not edges:
+            return
+
+        pairs = np.asarray(edges, dtype=np.int64)
+        ids, index = np.unique(pairs, return_inverse=True)
+        index = index.reshape(pairs.shape)
+        n = len(ids)
+
+        adjacency = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.int32), (index[:, 0], index[:, 1])),
+            shape=(n, n)
+        )
+        adjacency.data[:] = 1  # contatos duplicados somam ao montar a matriz
+        linked = ((adjacency + adjacency.T) > 0).astype(np.int32).tocsr()
+
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+
+            mutual = (linked[start:stop] @ linked).tocsr()
+            own = adjacency[start:stop] + sparse.eye(stop - start, n, k=start, dtype=np.int32, format='csr')
+            mutual = (mutual - mutual.multiply(own > 0)).tocsr()
+            mutual.data[mutual.data < min_mutual] = 0
+            mutual.eliminate_zeros()
+
+            for row in range(stop - start):
+                lo, hi = mutual.indptr[row], mutual.indptr[row + 1]
+                if lo == hi:
+                    continue
+
+                counts = mutual.data[lo:hi]
+                columns = mutual.indices[lo:hi]
+                if len(counts) > per_user:
+                    top = np.argpartition(-counts, per_user - 1)[:per_user]
+                    counts, columns = counts[top], columns[top]
+
+                user_id = int(ids[start + row])
+                for column, count in zip(columns, counts):
+                    yield user_id, int(ids[column]), min(int(count), 65535)
+
+    @staticmethod
+    def compute():
+        """
+        Recalcula todas as sugestões
+
+        Returns:
+            int: Número de sugestões gravadas
+        """
+        started = time.perf_counter()
+        computed_at = datetime.now().replace(microsecond=0)
+
+        edges = SuggestionRepository.find_all_edges()
+        Metrics.gauge('suggestions.edges', len(edges))
+
+        total = 0
+        batch = []
+        for row in SuggestionService.score(
+            edges,
+            per_user=Config.CONTACT_SUGGESTIONS_PER_USER,
+            min_mutual=Config.CONTACT_SUGGESTIONS_MIN_MUTUAL,
+            block_size=Config.CONTACT_SUGGESTIONS_BLOCK_SIZE
+        ):
+            batch.append(row)
+            if len(batch) >= 5000:
+                SuggestionRepository.upsert_many(batch, computed_at)
+                total += len(batch)
+                batch = []
+
+        if batch:
+            SuggestionRepository.upsert_many(batch, computed_at)
+            total += len(batch)
+
+        # O que não saiu nesta execução (contato adicionado, vínculo desfeito) sai da tabela
+        SuggestionRepository.delete_older_than(computed_at)
+
+        Metrics.gauge('suggestions.rows', total)
+        Metrics.observe('suggestions.compute', time.perf_counter() - started)
+        return total
+
+    @staticmethod
+    def get_suggestions(user_id):
+        try:
+            rows = SuggestionRepository.find_by_user(user_id, Config.CONTACT_SUGGESTIONS_PER_USER)
+
+            # Quem virou contato depois da última execução do job fica de fora
+            contact_ids = ContactService.get_contact_ids(user_id)
+            return [
+                {
+                    'id': row['id'],
+                    'name': row['name'],
+                    'email': row['email'],
+                    'mutual_count': row['mutual_count']
+                }
+                for row in rows
+                if row['id'] not in contact_ids
+            ]
+        except Exception as e:
+            print(f"Erro ao buscar sugestões: {e}")
+            return []
@@ -1,14 +1,41 @@
 # app/sockets/__init__.py - VERSÃO OTIMIZADA
 
+from functools import wraps
 from flask_socketio import emit, join_room, leave_room, disconnect
+from app.config import Config
 from app.services.auth_service import AuthService
+from app.services.contact_service import ContactService
 from app.repositories.user_repository import UserRepository
-from app.services.message_service import MessageService
-
-connected_users = {}
-typing_users = {}
+from app.services.message_pipeline import MessagePipeline
+from app.services.receipt_service import ReceiptService
+from app.services.schedule_service import ScheduleService
+from app.services.presence_service import PresenceService
+from app.sockets.session_registry import SessionRegistry
+from app.sockets.typing_tracker import TypingTracker
+from app.sockets.outbound import Outbound
+from app.sockets.backpressure import Backpressure
+from app.sockets.codec import WireCodec
+
+# sid <-> usuário (várias abas/dispositivos por usuário)
+sessions = SessionRegistry()
+# Quem está digitando em cada sala (throttle + expiração automática)
+typing = TypingTracker()
 
 def register_socket_events(socketio):
+    typing.init_app(socketio)
+    Outbound.init_app(socketio)
+
+    def on_event(event):
+        """`socketio.on` que também renova a presença da sessão a cada evento recebido"""
+        def decorator(handler):
+            @wraps(handler)
+            def wrapped(*args, **kwargs):
+                from flask import request
+
+                PresenceService.touch(request.sid)
+                return handler(*args, **kwargs)
+            return socketio.on(event)(wrapped)
+        return decorator
     
     @socketio.on('connect')
     def handle_connect(auth):
@@ -27,24 +54,41 @@ def register_socket_events(socketio):
             return False
         
         from flask import request
-        connected_users[user.id] = request.sid
-
-        emit('user_online', {
-            'user_id': user.id,
-            'name': user.name
-        }, broadcast=True, skip_sid=request.sid)
+        device = auth.get('device') or request.headers.get('User-Agent')
+        codec = WireCodec.negotiate(auth.get('codec'))
+
+        # Sala pessoal: alcança todos os dispositivos do usuário
+        # (sessões binárias têm a sala própria, veja WireCodec)
+        if codec == WireCodec.MSGPACK:
+            join_room(WireCodec.binary_room(user.id))
+        else:
+            join_room(get_user_room(user.id))
+
+        # Registra a sessão; os contatos recebem `presence_diff` (PresenceFanout)
+        PresenceService.connect(request.sid, user.id, user.name, device, codec)
+        emit('codec', {'codec': codec})
+
+        # Reenvia o que a sessão perdeu desde o último seq recebido
+        last_seq = auth.get('last_seq')
+        try:
+            last_seq = int(last_seq) if last_seq is not None else None
+        except (TypeError, ValueError):
+            last_seq = None
+        Outbound.replay(request.sid, user.id, last_seq)
 
-        print(f"Usuário {user.name} (ID: {user.id}) conectado")
+        print(f"Usuário {user.name} (ID: {user.id}) conectado ({len(sessions.sids_for(user.id))} sessão(ões))")
         return True
     
     # ============================================================
     # SEND MESSAGE - VERSÃO OTIMIZADA COM CONFIRMAÇÃO RÁPIDA
     # ============================================================
 
-    @socketio.on('send_message')
+    @on_event('send_message')
     def handle_send_message(data):
         from flask import request
-        from app.services.push_service import PushService
+
+        if isinstance(data, (bytes, bytearray)):
+            data = WireCodec.unpack(data)
 
         receiver_id = data.get('receiver_id')
         content = data.get('content')
@@ -59,94 +103,117 @@ def register_socket_events(socketio):
             emit('error', {'message': 'Usuario não autenticado'})
             return
         
+        # Envio agendado: só grava, o ScheduleService despacha no horário
+        if data.get('send_at'):
+            scheduled, error = ScheduleService.schedule(
+                user_id, receiver_id, content, data.get('send_at'), temp_id
+            )
+            if error:
+                emit('message_error', {
+                    'temp_id': temp_id,
+                    'message': error
+                })
+            else:
+                emit('message_scheduled', {
+                    'temp_id': temp_id,
+                    'scheduled': scheduled.to_dict()
+                })
+            return
+        
         # 1️⃣ ENVIAR CONFIRMAÇÃO IMEDIATA (antes de salvar no banco)
         emit('message_sending', {
             'temp_id': temp_id,
             'status': 'processing'
         })
         
-        # 2️⃣ SALVAR NO BANCO (assíncrono)
-        message, error = MessageService.send_message(user_id, receiver_id, content)
+        user = UserRepository.find_by_id(user_id)
+
+        # 2️⃣ VALIDAR, SALVAR E CONFIRMAR - fan-out e push seguem no pool
+        def acknowledge(message_data):
+            Outbound.emit_sid(request.sid, 'message_confirmed', {
+                'temp_id': temp_id,
+                'message': message_data
+            })
+
+        message, error = MessagePipeline.send(
+            user, receiver_id, content, temp_id, on_ack=acknowledge
+        )
 
         if error:
             emit('message_error', {
                 'temp_id': temp_id,
                 'message': error
             })
+    
+    @on_event('send_multicast')
+    def handle_send_multicast(data):
+        from flask import request
+
+        if isinstance(data, (bytes, bytearray)):
+            data = WireCodec.unpack(data)
+
+        receiver_ids = data.get('receiver_ids')
+        content = data.get('content')
+        temp_id = data.get('temp_id')
+
+        if not receiver_ids or not isinstance(receiver_ids, list) or not content:
+            emit('error', {'message': 'Dados inválidos'})
+            return
+        
+        user_id = get_user_id_from_sid(request.sid)
+        if not user_id:
+            emit('error', {'message': 'Usuario não autenticado'})
             return
         
         user = UserRepository.find_by_id(user_id)
 
-        message_data = {
-            'id': message.id,
-            'sender_id': message.sender_id,
-            'receiver_id': message.receiver_id,
-            'content': message.content,
-            'is_read': message.is_read,
-            'created_at': message.created_at.isoformat(),
-            'sender_name': user.name,
-            'temp_id': temp_id
-        }
-
-        # 3️⃣ ENVIAR PUSH NOTIFICATION (COM PROTEÇÃO ANTI-RECURSÃO)
-        try:
-            # ✅ Só enviar push se o destinatário NÃO estiver conectado OU
-            # estiver em outra conversa
-            is_receiver_online = receiver_id in connected_users
-            
-            if is_receiver_online:
-                print(f"⚠️ Destinatário {receiver_id} está online, pulando push notification")
-            else:
-                print(f"📲 Destinatário {receiver_id} offline, enviando push...")
-                PushService.send_message_notification(user, receiver_id, content)
-        except Exception as push_error:
-            # ✅ NÃO propagar erro de push - mensagem já foi salva
-            print(f"⚠️ Erro ao enviar push (não crítico): {push_error}")
-
-        # 4️⃣ CONFIRMAR PARA O REMETENTE
-        emit('message_confirmed', {
-            'temp_id': temp_id,
-            'message': message_data
-        })
+        def acknowledge(messages_data, invalid_ids):
+            Outbound.emit_sid(request.sid, 'multicast_confirmed', {
+                'temp_id': temp_id,
+                'messages': messages_data,
+                'invalid_ids': invalid_ids
+            })
 
-        # 5️⃣ ENVIAR PARA A SALA (ambos usuários)
-        room_id = get_room_id(user_id, receiver_id)
-        emit('new_message', message_data, room=room_id)
-
-        # 6️⃣ NOTIFICAR DESTINATÁRIO (se estiver online mas em outra conversa)
-        if receiver_id in connected_users:
-            receiver_sid = connected_users[receiver_id]
-            socketio.emit('message_notification', {
-                'message': message_data,
-                'from_user': {
-                    'id': user.id,
-                    'name': user.name
-                }
-            }, room=receiver_sid)
-        
-        print(f"✅ Mensagem {message.id} enviada de {user_id} para {receiver_id}")
+        messages, invalid_ids, error = MessagePipeline.send_multicast(
+            user, receiver_ids, content, temp_id, on_ack=acknowledge
+        )
+
+        if error:
+            emit('message_error', {
+                'temp_id': temp_id,
+                'message': error,
+                'invalid_ids': invalid_ids
+            })
     
     # ============================================================
     # MARCAR COMO ENTREGUE (quando destinatário recebe)
     # ============================================================
     
-    @socketio.on('message_delivered')
+    @on_event('message_delivered')
     def handle_message_delivered(data):
         from flask import request
         
         message_id = data.get('message_id')
+        message_ids = data.get('message_ids') or ([message_id] if message_id else [])
         sender_id = data.get('sender_id')
         
-        if not message_id or not sender_id:
+        if not message_ids or not sender_id:
             return
         
-        # Notificar remetente que mensagem foi entregue
-        if sender_id in connected_users:
-            sender_sid = connected_users[sender_id]
-            socketio.emit('message_status_update', {
-                'message_id': message_id,
+        user_id = get_user_id_from_sid(request.sid)
+        if not user_id:
+            return
+        
+        # Persistido em lote pelo ReceiptService
+        ReceiptService.record_delivered(user_id, sender_id, message_ids)
+        
+        # Notificar remetente (todos os dispositivos) que a mensagem foi entregue;
+        # fica no buffer de replay mesmo que ele esteja offline agora
+        for delivered_id in message_ids:
+            Outbound.emit_to_user(sender_id, 'message_status_update', {
+                'message_id': delivered_id,
                 'status': 'delivered'
-            }, room=sender_sid)
+            }, batch=True)
     
     # ============================================================
     # OUTROS EVENTOS (mantidos iguais)
@@ -156,22 +223,41 @@ def register_socket_events(socketio):
     def handle_disconnect():
         from flask import request
 
-        user_id = None
-        for uid, sid in connected_users.items():
-            if sid == request.sid:
-                user_id = uid
-                break
-        
-        if user_id:
-            del connected_users[user_id]
-
-            emit('user_offline', {
+        # "Digitando" que a sessão deixou aberto
+        for room_id, user_id in typing.clear_sid(request.sid):
+            emit('user_stopped_typing', {
                 'user_id': user_id
-            }, broadcast=True)
+            }, room=room_id, skip_sid=request.sid)
+
+        Backpressure.forget(request.sid)
+
+        # Última sessão: os contatos recebem `presence_diff` (PresenceFanout)
+        PresenceService.disconnect(request.sid)
+    
+    @on_event('presence_ping')
+    def handle_presence_ping(data=None):
+        from flask import request
+
+        # Heartbeat explícito: renova mesmo dentro da janela do throttle
+        PresenceService.touch(request.sid, force=True)
+    
+    @on_event('presence_snapshot')
+    def handle_presence_snapshot(data=None):
+        from flask import request
 
-            print(f"Usuário {user_id} desconectado")
+        user_id = get_user_id_from_sid(request.sid)
+        if not user_id:
+            return
+        
+        user_ids = (data or {}).get('ids')
+        if user_ids is not None:
+            user_ids = user_ids[:Config.PRESENCE_SNAPSHOT_MAX_IDS]
+        
+        presence = ContactService.get_contacts_presence(user_id, user_ids)
+        emit('presence_snapshot', {'presence': presence})
+        return {'presence': presence}
     
-    @socketio.on('join_conversation')
+    @on_event('join_conversation')
     def handle_join_conversation(data):
         from flask import request
 
@@ -185,7 +271,7 @@ def register_socket_events(socketio):
         join_room(room_id)
         print(f"Usuário {user_id} entrou na sala {room_id}")
     
-    @socketio.on('leave_conversation')
+    @on_event('leave_conversation')
     def handle_leave_conversation(data):
         from flask import request
 
@@ -199,29 +285,31 @@ def register_socket_events(socketio):
         leave_room(room_id)
         print(f"Usuário {user_id} saiu da sala {room_id}")
     
-    @socketio.on('typing_start')
+    @on_event('typing_start')
     def handle_typing_start(data):
         from flask import request
-        import time
 
         contact_user_id = data.get('contact_user_id')
         if not contact_user_id:
             return
         
         user_id = get_user_id_from_sid(request.sid)
+        if not user_id:
+            return
         room_id = get_room_id(user_id, contact_user_id)
 
-        if room_id not in typing_users:
-            typing_users[room_id] = {}
-        typing_users[room_id][user_id] = time.time()
+        # Eventos repetidos só renovam o prazo (no máximo um por TYPING_THROTTLE)
+        if not typing.start(room_id, user_id, request.sid):
+            return
 
-        user = UserRepository.find_by_id(user_id)
-        emit('user_typing', {
+        # Nome vem da sessão, sem consultar o banco a cada tecla
+        meta = sessions.meta(request.sid) or {}
+        Outbound.emit_droppable('user_typing', {
             'user_id': user_id,
-            'name': user.name
-        }, room=room_id, skip_sid=request.sid)
+            'name': meta.get('name')
+        }, room_id, skip_sid=request.sid)
     
-    @socketio.on('typing_stop')
+    @on_event('typing_stop')
     def handle_typing_stop(data):
         from flask import request
 
@@ -230,16 +318,18 @@ def register_socket_events(socketio):
             return
         
         user_id = get_user_id_from_sid(request.sid)
+        if not user_id:
+            return
         room_id = get_room_id(user_id, contact_user_id)
 
-        if room_id in typing_users and user_id in typing_users[room_id]:
-            del typing_users[room_id][user_id]
+        if not typing.stop(room_id, user_id):
+            return
         
         emit('user_stopped_typing', {
             'user_id': user_id
         }, room=room_id, skip_sid=request.sid)
     
-    @socketio.on('message_read')
+    @on_event('message_read')
     def handle_message_read(data):
         from flask import request
 
@@ -248,20 +338,27 @@ def register_socket_events(socketio):
             return
         
         user_id = get_user_id_from_sid(request.sid)
+        if not user_id:
+            return
 
-        MessageService.mark_conversation_as_read(user_id, sender_id)
+        # Última mensagem que o cliente exibiu (opcional): limite da leitura
+        last_message_id = data.get('last_message_id')
+        if not isinstance(last_message_id, int) or isinstance(last_message_id, bool):
+            last_message_id = None
 
-        if sender_id in connected_users:
-            sender_sid = connected_users[sender_id]
-            socketio.emit('messages_read', {
-                'by_user_id': user_id
-            }, room=sender_sid)
+        # Persistido em lote pelo ReceiptService
+        ReceiptService.record_read(user_id, sender_id, last_message_id)
+
+        Outbound.emit_to_user(sender_id, 'messages_read', {
+            'by_user_id': user_id,
+            'last_message_id': last_message_id
+        }, batch=True)
 
 def get_user_id_from_sid(sid):
-    for user_id, socket_id in connected_users.items():
-        if socket_id == sid:
-            return user_id
-    return None
+    return sessions.user_for(sid)
+
+def get_user_room(user_id):
+    return f"user_{user_id}"
 
 def get_room_id(user1_id, user2_id):
     return f"chat_{min(user1_id, user2_id)}_{max(user1_id, user2_id)}"
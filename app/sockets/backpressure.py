@@ -0,0 +1,171 @@
+# app/sockets/backpressure.py
+
+import time
+import threading
+from app.config import Config
+from app.utils.metrics import Metrics
+from app.utils.shared_store import get_shared_store
+
+
+class Backpressure:
+    """
+    Controle de fila de saída por sessão (clientes lentos)
+
+    Cada sessão tem a fila de pacotes do Engine.IO; um cliente lento (rede
+    móvel, long-polling) acumula pacotes ali indefinidamente. A cada
+    BACKPRESSURE_INTERVAL o monitor mede essas filas e:
+
+    - acima de BACKPRESSURE_HIGH_WATER a sessão fica "congestionada": eventos
+      de baixo valor deixam de ser enviados a ela (`user_typing` é
+      descartado, `presence_diff` é agregado e enviado quando a fila esvazia);
+    - abaixo de BACKPRESSURE_LOW_WATER volta ao normal;
+    - congestionada por mais de BACKPRESSURE_MAX_SECONDS é desconectada
+      (ao reconectar, o replay recupera os eventos importantes).
+
+    As sessões congestionadas ficam num conjunto no armazenamento
+    compartilhado, então o worker que emite respeita o estado de sessões
+    que vivem em outros workers. A profundidade de cada fila local vai para
+    o gauge `socket.queue_depth`.
+    """
+
+    CONGESTED_KEY = 'backpressure:congested'
+
+    _lock = threading.Lock()
+    _socketio = None
+    _thread = None
+    # sid -> início do congestionamento (sessões locais)
+    _since = {}
+    # Visão (atualizada pelo monitor) das sessões congestionadas de todos os workers
+    _congested = frozenset()
+    # sid -> {event: (data, merge)} eventos agregados aguardando a fila esvaziar
+    _deferred = {}
+
+    @staticmethod
+    def init_app(socketio):
+        Backpressure._socketio = socketio
+        if Backpressure._thread is not None:
+            return
+
+        Backpressure._thread = threading.Thread(
+            target=Backpressure._run,
+            name='socket-backpressure',
+            daemon=True
+        )
+        Backpressure._thread.start()
+
+    @staticmethod
+    def queue_depth(sid):
+        """Pacotes aguardando envio na sessão (None se ela não for local)"""
+        server = Backpressure._socketio.server
+        try:
+            eio_sid = server.manager.eio_sid_from_sid(sid, '/')
+            socket = server.eio.sockets.get(eio_sid)
+        except Exception:
+            return None
+
+        if socket is None:
+            return None
+        return socket.queue.qsize()
+
+    @staticmethod
+    def is_congested(sid):
+        return sid in Backpressure._congested
+
+    @staticmethod
+    def skip_sids(skip_sid=None):
+        """Sessões a pular num emit de baixo valor (congestionadas + skip_sid)"""
+        skip = list(Backpressure._congested)
+        if skip_sid is not None:
+            skip.append(skip_sid)
+        return skip or None
+
+    @staticmethod
+    def defer(sid, event, data, merge):
+        """Guarda `data` para enviar a `sid` quando a fila esvaziar"""
+        with Backpressure._lock:
+            pending = Backpressure._deferred.setdefault(sid, {})
+            previous = pending.get(event)
+            pending[event] = (merge(previous[0], data) if previous else data, merge)
+
+        Metrics.incr('backpressure.coalesced')
+
+    @staticmethod
+    def forget(sid):
+        """Sessão desconectada: descarta o estado dela"""
+        with Backpressure._lock:
+            Backpressure._deferred.pop(sid, None)
+            was_congested = Backpressure._since.pop(sid, None) is not None
+
+        if was_congested:
+            get_shared_store().srem(Backpressure.CONGESTED_KEY, sid)
+
+    @staticmethod
+    def check():
+        """Mede as filas locais e atualiza o estado de congestionamento"""
+        from app.sockets import sessions
+
+        store = get_shared_store()
+        now = time.time()
+        depths = []
+        to_disconnect = []
+
+        for sid in sessions.local_sids():
+            depth = Backpressure.queue_depth(sid)
+            if depth is None:
+                continue
+            depths.append(depth)
+
+            congested_at = Backpressure._since.get(sid)
+            if congested_at is None and depth > Config.BACKPRESSURE_HIGH_WATER:
+                Backpressure._since[sid] = now
+                store.sadd(Backpressure.CONGESTED_KEY, sid)
+                Metrics.incr('backpressure.congested')
+            elif congested_at is not None and depth <= Config.BACKPRESSURE_LOW_WATER:
+                Backpressure._since.pop(sid, None)
+                store.srem(Backpressure.CONGESTED_KEY, sid)
+            elif congested_at is not None and now - congested_at > Config.BACKPRESSURE_MAX_SECONDS:
+                to_disconnect.append(sid)
+
+        Backpressure._congested = frozenset(store.smembers(Backpressure.CONGESTED_KEY))
+
+        # Só agregados: sids não saem em /metrics
+        ordered = sorted(depths)
+        Metrics.gauge('socket.queue_depth.sessions', len(ordered))
+        Metrics.gauge('socket.queue_depth.p95', ordered[int(len(ordered) * 0.95)] if ordered else 0)
+        Metrics.gauge('socket.queue_depth.max', ordered[-1] if ordered else 0)
+        Metrics.gauge('socket.congested', len(Backpressure._congested))
+
+        Backpressure._flush_deferred()
+
+        for sid in to_disconnect:
+            print(f"🐢 Sessão {sid} acima do limite de fila por muito tempo, desconectando")
+            Metrics.incr('backpressure.disconnected')
+            Backpressure.forget(sid)
+            try:
+                Backpressure._socketio.server.disconnect(sid)
+            except Exception as e:
+                print(f"⚠️ Erro ao desconectar sessão lenta {sid}: {e}")
+
+    @staticmethod
+    def _flush_deferred():
+        with Backpressure._lock:
+            ready = {
+                sid: pending for sid, pending in Backpressure._deferred.items()
+                if sid not in Backpressure._congested
+            }
+            for sid in ready:
+                del Backpressure._deferred[sid]
+
+        from app.sockets.outbound import Outbound
+        for sid, pending in ready.items():
+            for event, (data, _) in pending.items():
+                Outbound.emit_sid(sid, event, data)
+
+    @staticmethod
+    def _run():
+        while True:
+            time.sleep(Config.BACKPRESSURE_INTERVAL)
+            try:
+                Backpressure.check()
+            except Exception as e:
+                print(f"❌ Erro ao medir filas de saída: {e}")
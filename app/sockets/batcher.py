@@ -0,0 +1,123 @@
+# app/sockets/batcher.py
+
+import time
+import threading
+from app.config import Config
+from app.sockets.backpressure import Backpressure
+from app.utils.metrics import Metrics
+
+
+class EventBatcher:
+    """
+    Agrupa eventos de baixa prioridade em um único pacote por janela
+
+    Confirmações de entrega/leitura e mudanças de presença chegam em
+    rajadas (várias mensagens entregues de uma vez, vários contatos ficando
+    online). Em vez de um pacote Engine.IO por evento, os eventos de cada
+    usuário ficam BATCH_WINDOW_MS acumulados e saem juntos:
+
+        socket.on('batch', ({ events }) => events.forEach(({ event, data }) => ...))
+
+    Uma janela com um único evento sai como o evento original. Mensagens
+    de chat não passam por aqui.
+
+    Eventos com `merge` (ex.: presence_diff) são agregados dentro da janela
+    e, para sessões congestionadas (Backpressure), ficam adiados até a fila
+    esvaziar; os demais são entregues mesmo a sessões congestionadas.
+    """
+
+    _lock = threading.Lock()
+    _wakeup = threading.Event()
+    _socketio = None
+    _thread = None
+    # user_id -> [(event, data, merge)]
+    _pending = {}
+
+    @staticmethod
+    def init_app(socketio):
+        EventBatcher._socketio = socketio
+        if EventBatcher._thread is not None:
+            return
+
+        EventBatcher._thread = threading.Thread(
+            target=EventBatcher._run,
+            name='socket-batcher',
+            daemon=True
+        )
+        EventBatcher._thread.start()
+
+    @staticmethod
+    def add(user_id, event, data, merge=None):
+        """Enfileira um evento para a sala pessoal do usuário"""
+        with EventBatcher._lock:
+            events = EventBatcher._pending.setdefault(user_id, [])
+
+            if merge is not None:
+                for i, (queued_event, queued_data, _) in enumerate(events):
+                    if queued_event == event:
+                        events[i] = (event, merge(queued_data, data), merge)
+                        return
+
+            events.append((event, data, merge))
+
+        EventBatcher._wakeup.set()
+
+    @staticmethod
+    def flush():
+        from app.sockets import sessions
+
+        with EventBatcher._lock:
+            pending = EventBatcher._pending
+            EventBatcher._pending = {}
+
+        for user_id, events in pending.items():
+            congested = []
+            if Backpressure.skip_sids():
+                congested = [
+                    sid for sid in sessions.sids_for(user_id)
+                    if Backpressure.is_congested(sid)
+                ]
+
+            EventBatcher._emit(events, user_id=user_id, skip_sid=congested or None)
+
+            # Sessões congestionadas: só o que não pode ser agregado
+            for sid in congested:
+                urgent = []
+                for event, data, merge in events:
+                    if merge is None:
+                        urgent.append((event, data, merge))
+                    else:
+                        Backpressure.defer(sid, event, data, merge)
+                if urgent:
+                    EventBatcher._emit(urgent, sid=sid)
+
+        Metrics.incr('batcher.flushes')
+
+    @staticmethod
+    def _emit(events, user_id=None, sid=None, skip_sid=None):
+        from app.sockets.outbound import Outbound
+
+        if len(events) == 1:
+            event, data, _ = events[0]
+        else:
+            event, data = 'batch', {
+                'events': [{'event': event, 'data': data} for event, data, _ in events]
+            }
+            Metrics.incr('batcher.events_batched', len(events))
+
+        if sid is not None:
+            Outbound.emit_sid(sid, event, data)
+        else:
+            Outbound.emit_user(user_id, event, data, skip_sid=skip_sid)
+
+    @staticmethod
+    def _run():
+        while True:
+            EventBatcher._wakeup.wait()
+            EventBatcher._wakeup.clear()
+            time.sleep(Config.BATCH_WINDOW_MS / 1000)
+
+            try:
+                EventBatcher.flush()
+            except Exception as e:
+                print(f"❌ Erro ao enviar lote de eventos: {e}")
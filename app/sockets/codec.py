@@ -0,0 +1,91 @@
+# app/sockets/codec.py
+
+from app.config import Config
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Nomes de campo -> códigos curtos usados no formato binário
+FIELD_CODES = {
+    'id': 'i',
+    'sender_id': 's',
+    'receiver_id': 'r',
+    'content': 'c',
+    'is_read': 'ir',
+    'created_at': 't',
+    'delivered_at': 'da',
+    'sender_name': 'sn',
+    'temp_id': 'tp',
+    'client_id': 'ci',
+    'status': 'st',
+    'message': 'm',
+    'messages': 'ms',
+    'message_id': 'mi',
+    'from_user': 'f',
+    'name': 'n',
+    'user_id': 'u',
+    'by_user_id': 'b',
+    'last_seen': 'ls',
+    'online': 'on',
+    'offline': 'of',
+    'invalid_ids': 'ii',
+    'events': 'e',
+    'event': 'ev',
+    'data': 'd',
+    'seq': 'q',
+}
+FIELD_NAMES = {code: name for name, code in FIELD_CODES.items()}
+
+
+class WireCodec:
+    """
+    Formato binário opcional (MessagePack com chaves curtas)
+
+    O cliente pede `codec: 'msgpack'` no auth da conexão. As sessões binárias
+    entram na sala `user_<id>:msgpack` em vez de `user_<id>`, e os eventos
+    enviados pelo Outbound saem como bytes (MessagePack) com os nomes de
+    campo trocados por FIELD_CODES. Eventos de controle (erros, typing,
+    replay_done...) continuam em JSON: payload binário é MessagePack,
+    payload texto é JSON.
+    """
+
+    JSON = 'json'
+    MSGPACK = 'msgpack'
+
+    @staticmethod
+    def negotiate(requested):
+        """Codec efetivo da sessão (JSON se o binário não estiver disponível)"""
+        if requested == WireCodec.MSGPACK and msgpack is not None and Config.MSGPACK_ENABLED:
+            return WireCodec.MSGPACK
+        return WireCodec.JSON
+
+    @staticmethod
+    def binary_room(user_id):
+        return f"user_{user_id}:msgpack"
+
+    @staticmethod
+    def shorten(value):
+        if isinstance(value, dict):
+            return {FIELD_CODES.get(k, k): WireCodec.shorten(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [WireCodec.shorten(v) for v in value]
+        return value
+
+    @staticmethod
+    def expand(value):
+        if isinstance(value, dict):
+            return {FIELD_NAMES.get(k, k): WireCodec.expand(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [WireCodec.expand(v) for v in value]
+        return value
+
+    @staticmethod
+    def pack(data):
+        return msgpack.packb(WireCodec.shorten(data), use_bin_type=True, default=str)
+
+    @staticmethod
+    def unpack(payload):
+        return WireCodec.expand(msgpack.unpackb(payload, raw=False))
@@ -0,0 +1,127 @@
+# app/sockets/outbound.py
+
+from app.sockets.backpressure import Backpressure
+from app.sockets.batcher import EventBatcher
+from app.sockets.codec import WireCodec
+from app.sockets.replay_buffer import ReplayBuffer
+from app.utils.metrics import Metrics
+
+
+class Outbound:
+    """
+    Envio de eventos para a sala pessoal do usuário com replay
+
+    Eventos que o cliente não pode perder (`new_message`,
+    `message_status_update`, `messages_read`) passam por `emit_to_user`:
+    ganham um `seq` por usuário e ficam no ReplayBuffer. Ao reconectar com
+    `last_seq` no auth, `replay` reenvia o intervalo perdido para a sessão
+    ou pede uma sincronização completa (`resync_required`).
+
+    Eventos de baixo valor usam `emit_droppable` (descartado para sessões
+    congestionadas) ou `emit_coalesced` (agregado até a fila esvaziar);
+    veja Backpressure. Com `batch=True` (e sempre em `emit_coalesced`) o
+    evento sai agrupado com outros pelo EventBatcher.
+
+    `emit_user` e `emit_sid` são o ponto único de saída para salas pessoais
+    e sessões: serializam uma vez em MessagePack para as sessões binárias
+    (WireCodec) e mantêm JSON para as demais.
+    """
+
+    _socketio = None
+    replay_buffer = ReplayBuffer()
+
+    @staticmethod
+    def init_app(socketio):
+        Outbound._socketio = socketio
+        Backpressure.init_app(socketio)
+        EventBatcher.init_app(socketio)
+
+    @staticmethod
+    def emit_to_user(user_id, event, data, batch=False):
+        """Emite para todos os dispositivos do usuário, registrando o evento"""
+        try:
+            seq = Outbound.replay_buffer.append(user_id, event, data)
+        except Exception as e:
+            # Sem buffer o evento ainda é entregue ao vivo
+            print(f"⚠️ Erro ao registrar evento {event} de {user_id}: {e}")
+            seq = None
+
+        if batch:
+            EventBatcher.add(user_id, event, dict(data, seq=seq))
+        else:
+            Outbound.emit_user(user_id, event, dict(data, seq=seq))
+
+    @staticmethod
+    def emit_user(user_id, event, data, skip_sid=None):
+        """Emite para a sala pessoal em JSON e/ou binário, conforme as sessões"""
+        from app.sockets import get_user_room, sessions
+
+        socketio = Outbound._socketio
+        socketio.emit(event, data, room=get_user_room(user_id), skip_sid=skip_sid)
+
+        if sessions.has_binary(user_id):
+            socketio.emit(
+                event, WireCodec.pack(data),
+                room=WireCodec.binary_room(user_id), skip_sid=skip_sid
+            )
+
+    @staticmethod
+    def emit_sid(sid, event, data):
+        """Emite para uma sessão no codec que ela negociou"""
+        from app.sockets import sessions
+
+        if sessions.codec_for(sid) == WireCodec.MSGPACK:
+            data = WireCodec.pack(data)
+        Outbound._socketio.emit(event, data, to=sid)
+
+    @staticmethod
+    def emit_droppable(event, data, room, skip_sid=None):
+        """Emite para a sala, exceto sessões com fila de saída cheia"""
+        skip = Backpressure.skip_sids(skip_sid)
+        if skip and len(skip) > (skip_sid is not None):
+            Metrics.incr('backpressure.dropped_emits')
+
+        Outbound._socketio.emit(event, data, room=room, skip_sid=skip)
+
+    @staticmethod
+    def emit_coalesced(user_id, event, data, merge):
+        """
+        Emite para a sala pessoal em lote; sessões congestionadas recebem
+        depois, com tudo que acumulou agregado por `merge(anterior, novo)`
+        """
+        EventBatcher.add(user_id, event, data, merge)
+
+    @staticmethod
+    def replay(sid, user_id, last_seq):
+        """
+        Reenvia para `sid` os eventos posteriores a `last_seq`
+
+        Sempre termina com `replay_done` (seq atual) ou `resync_required`.
+        Eventos ao vivo podem chegar repetidos durante o replay; o cliente
+        ignora qualquer seq que já tenha visto.
+        """
+        socketio = Outbound._socketio
+
+        if last_seq is None:
+            socketio.emit('replay_done', {
+                'seq': Outbound.replay_buffer.current_seq(user_id),
+                'replayed': 0
+            }, to=sid)
+            return
+
+        events, complete = Outbound.replay_buffer.since(user_id, last_seq)
+        if not complete:
+            Metrics.incr('replay.resync')
+            socketio.emit('resync_required', {
+                'seq': Outbound.replay_buffer.current_seq(user_id)
+            }, to=sid)
+            return
+
+        for entry in events:
+            Outbound.emit_sid(sid, entry['event'], dict(entry['data'], seq=entry['seq']))
+
+        Metrics.incr('replay.events', len(events))
+        socketio.emit('replay_done', {
+            'seq': events[-1]['seq'] if events else last_seq,
+            'replayed': len(events)
+        }, to=sid)
@@ -0,0 +1,80 @@
+# app/sockets/replay_buffer.py
+
+import json
+from app.config import Config
+from app.utils.shared_store import get_shared_store
+
+
+class ReplayBuffer:
+    """
+    Buffer circular por usuário dos últimos eventos enviados
+
+    Cada evento recebe um número de sequência crescente por usuário
+    (`replay:seq:<id>`) e vai para uma lista limitada a REPLAY_BUFFER_SIZE
+    itens (`replay:events:<id>`) no armazenamento compartilhado, então o
+    replay funciona mesmo que a reconexão caia em outro worker.
+
+    Na reconexão o cliente informa o último `seq` que recebeu; `since`
+    devolve o que faltou ou indica que o buffer já descartou parte do
+    intervalo (o cliente precisa sincronizar tudo de novo).
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_shared_store()
+        return self._store
+
+    @staticmethod
+    def _seq_key(user_id):
+        return f"replay:seq:{user_id}"
+
+    @staticmethod
+    def _events_key(user_id):
+        return f"replay:events:{user_id}"
+
+    def append(self, user_id, event, data):
+        """
+        Registra um evento para o usuário
+
+        Returns:
+            int: Número de sequência atribuído
+        """
+        seq = self.store.incr(self._seq_key(user_id))
+        entry = json.dumps({'seq': seq, 'event': event, 'data': data}, default=str)
+        self.store.rpush(
+            self._events_key(user_id),
+            entry,
+            maxlen=Config.REPLAY_BUFFER_SIZE,
+            ttl=Config.REPLAY_TTL_SECONDS
+        )
+        return seq
+
+    def current_seq(self, user_id):
+        value = self.store.get(self._seq_key(user_id))
+        return int(value) if value is not None else 0
+
+    def since(self, user_id, last_seq):
+        """
+        Eventos com seq maior que `last_seq`
+
+        Returns:
+            tuple: (events, complete) - `complete` é False se parte do
+            intervalo já saiu do buffer (ou expirou)
+        """
+        current = self.current_seq(user_id)
+        if last_seq >= current:
+            # Nada novo (ou o contador foi reiniciado: last_seq > current)
+            return [], last_seq == current
+
+        events = [json.loads(entry) for entry in self.store.lrange(self._events_key(user_id))]
+        events = sorted(
+            (entry for entry in events if entry['seq'] > last_seq),
+            key=lambda entry: entry['seq']
+        )
+
+        complete = bool(events) and events[0]['seq'] == last_seq + 1
+        return events, complete
@@ -0,0 +1,146 @@
+# app/sockets/session_registry.py
+
+import time
+import threading
+from app.config import Config
+from app.utils.shared_store import get_shared_store
+
+
+class SessionRegistry:
+    """
+    Índice bidirecional das sessões Socket.IO
+
+    Mantém `sid -> user_id` e `user_id -> {sids}` para que um usuário possa
+    ter várias abas/dispositivos conectados ao mesmo tempo. Todas as
+    operações são O(1).
+
+    O mapa `user_id -> {sids}` e os metadados ficam no armazenamento
+    compartilhado (`get_shared_store`), então com vários workers/nós
+    `is_online` e `sids_for` enxergam as sessões de todos eles. As sessões
+    locais também ficam num dicionário do processo para os handlers.
+
+    Cada sid no conjunto do usuário tem prazo próprio (`ttl`, padrão
+    PRESENCE_TTL) renovado por `refresh` no heartbeat da presença: sessões
+    de um worker que caiu somem sozinhas. `add`/`remove` alteram o conjunto
+    e devolvem a contagem numa única operação atômica, então conexões
+    simultâneas não perdem nem duplicam a transição online/offline.
+    """
+
+    def __init__(self, store=None, ttl=None):
+        self._store = store
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._sid_to_user = {}
+        # sid -> metadados do dispositivo (nome do usuário, device, horário)
+        self._meta = {}
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_shared_store()
+        return self._store
+
+    @property
+    def ttl(self):
+        return self._ttl or Config.PRESENCE_TTL
+
+    @staticmethod
+    def _user_key(user_id):
+        return f"sessions:user:{user_id}"
+
+    @staticmethod
+    def _sid_key(sid):
+        return f"sessions:sid:{sid}"
+
+    @staticmethod
+    def _binary_key(user_id):
+        return f"sessions:binary:{user_id}"
+
+    def add(self, sid, user_id, name=None, device=None, codec='json'):
+        """
+        Registra uma sessão
+
+        Returns:
+            bool: True se for a primeira sessão do usuário (ficou online)
+        """
+        meta = {
+            'user_id': user_id,
+            'name': name,
+            'device': device,
+            'codec': codec,
+            'connected_at': time.time()
+        }
+
+        with self._lock:
+            self._sid_to_user[sid] = user_id
+            self._meta[sid] = meta
+
+        self.store.hset(self._sid_key(sid), meta, ttl=self.ttl)
+        if codec != 'json':
+            self.store.lease_add(self._binary_key(user_id), sid, self.ttl)
+        return self.store.lease_add(self._user_key(user_id), sid, self.ttl) == 1
+
+    def refresh(self, sid):
+        """Renova o prazo de uma sessão local no armazenamento compartilhado"""
+        user_id = self._sid_to_user.get(sid)
+        if user_id is None:
+            return False
+
+        self.store.lease_add(self._user_key(user_id), sid, self.ttl)
+        if self.codec_for(sid) != 'json':
+            self.store.lease_add(self._binary_key(user_id), sid, self.ttl)
+        self.store.expire(self._sid_key(sid), self.ttl)
+        return True
+
+    def remove(self, sid):
+        """
+        Remove uma sessão
+
+        Returns:
+            tuple: (user_id, last) - `last` é True se era a última sessão
+            do usuário (ficou offline). user_id é None se o sid não existia.
+        """
+        with self._lock:
+            user_id = self._sid_to_user.pop(sid, None)
+            self._meta.pop(sid, None)
+
+        if user_id is None:
+            return None, False
+
+        self.store.delete(self._sid_key(sid))
+        self.store.lease_remove(self._binary_key(user_id), sid)
+        return user_id, self.store.lease_remove(self._user_key(user_id), sid) == 0
+
+    def user_for(self, sid):
+        """Usuário de uma sessão local (handlers só recebem sids locais)"""
+        return self._sid_to_user.get(sid)
+
+    def meta(self, sid):
+        meta = self._meta.get(sid)
+        if meta is None:
+            meta = self.store.hgetall(self._sid_key(sid)) or None
+        return meta
+
+    def is_local(self, sid):
+        return sid in self._sid_to_user
+
+    def sids_for(self, user_id):
+        return self.store.lease_members(self._user_key(user_id))
+
+    def local_sids(self):
+        with self._lock:
+            return list(self._sid_to_user)
+
+    def codec_for(self, sid):
+        meta = self.meta(sid)
+        return (meta or {}).get('codec') or 'json'
+
+    def has_binary(self, user_id):
+        """True se alguma sessão do usuário usa o formato binário"""
+        return self.store.lease_count(self._binary_key(user_id)) > 0
+
+    def is_online(self, user_id):
+        return self.store.lease_count(self._user_key(user_id)) > 0
+
+    def __len__(self):
+        return len(self._sid_to_user)
@@ -0,0 +1,122 @@
+# app/sockets/typing_tracker.py
+
+import time
+import threading
+from app.config import Config
+from app.utils.metrics import Metrics
+from app.utils.timer_wheel import TimerWheel
+
+
+class TypingTracker:
+    """
+    Estado de "digitando" por sala, com throttle e expiração
+
+    - `start` só autoriza um `user_typing` por usuário/sala a cada
+      TYPING_THROTTLE segundos; os demais apenas renovam o prazo.
+    - Sem novo `typing_start` por TYPING_TIMEOUT segundos, o sweeper emite
+      `user_stopped_typing` automaticamente.
+    - `clear_sid` remove tudo o que uma sessão deixou ao desconectar.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wheel = TimerWheel(tick=1.0, slots=64, levels=1)
+        # (room_id, user_id) -> (sid, último user_typing emitido)
+        self._active = {}
+        # sid -> {(room_id, user_id)}
+        self._by_sid = {}
+        self._thread = None
+
+    def init_app(self, socketio):
+        if self._thread is not None:
+            return
+
+        self._socketio = socketio
+        self._thread = threading.Thread(
+            target=self._run,
+            name='typing-sweeper',
+            daemon=True
+        )
+        self._thread.start()
+
+    def start(self, room_id, user_id, sid):
+        """
+        Registra que o usuário está digitando
+
+        Returns:
+            bool: True se um `user_typing` deve ser emitido agora
+        """
+        key = (room_id, user_id)
+        now = time.time()
+
+        with self._lock:
+            previous_sid, last_emit = self._active.get(key, (None, 0.0))
+            should_emit = now - last_emit >= Config.TYPING_THROTTLE
+            if should_emit:
+                last_emit = now
+
+            # Outra aba do mesmo usuário assumiu: o disconnect da antiga não
+            # pode mais limpar esse estado
+            if previous_sid is not None and previous_sid != sid:
+                self._unlink_sid(previous_sid, key)
+
+            self._active[key] = (sid, last_emit)
+            self._by_sid.setdefault(sid, set()).add(key)
+            self._wheel.schedule(key, now + Config.TYPING_TIMEOUT)
+
+        return should_emit
+
+    def stop(self, room_id, user_id):
+        """
+        Returns:
+            bool: True se o usuário estava digitando
+        """
+        with self._lock:
+            return self._discard((room_id, user_id))
+
+    def clear_sid(self, sid):
+        """
+        Remove os estados de uma sessão
+
+        Returns:
+            list: Tuplas (room_id, user_id) que estavam ativas
+        """
+        with self._lock:
+            keys = list(self._by_sid.get(sid, ()))
+            return [key for key in keys if self._discard(key)]
+
+    def _discard(self, key, cancel=True):
+        entry = self._active.pop(key, None)
+        if entry is None:
+            return False
+
+        sid, _ = entry
+        if cancel:
+            self._wheel.cancel(key)
+        self._unlink_sid(sid, key)
+        return True
+
+    def _unlink_sid(self, sid, key):
+        keys = self._by_sid.get(sid)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_sid[sid]
+
+    def _run(self):
+        while True:
+            time.sleep(1.0)
+
+            with self._lock:
+                expired = self._wheel.advance(time.time())
+                # O timer já saiu da roda; só limpar os índices
+                expired = [key for key, _ in expired if self._discard(key, cancel=False)]
+
+            for room_id, user_id in expired:
+                Metrics.incr('typing.expired')
+                self._socketio.emit('user_stopped_typing', {
+                    'user_id': user_id
+                }, room=room_id)
+
+    def __len__(self):
+        return len(self._active)
@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.metrics import Metrics
+
+
+class BlockingPool:
+    """
+    Executa funções de CPU pesada (bcrypt) fora do loop de eventos
+
+    Com eventlet/gevent, uma chamada longa no greenlet atual congela todos
+    os sockets do worker. Aqui a função roda em uma thread nativa:
+
+    - gevent com monkey patch (gunicorn --worker-class gevent): threadpool do hub
+    - eventlet instalado: `eventlet.tpool`
+    - sem nenhum dos dois: ThreadPoolExecutor próprio
+
+    Um semáforo limita quantas chamadas rodam ao mesmo tempo; as demais
+    esperam (cedendo o loop) em vez de disputar CPU com os sockets.
+
+    Args:
+        name (str): Prefixo das métricas
+        max_concurrency (int): Máximo de execuções simultâneas
+
+    Usage:
+        pool = BlockingPool('bcrypt', max_concurrency=2)
+        hashed = pool.run(bcrypt.hashpw, password, salt)
+    """
+
+    def __init__(self, name, max_concurrency=2):
+        self.name = name
+        self._max_concurrency = max_concurrency
+        self._runner = None
+        self._slots = None
+
+    def _setup(self):
+        # Resolvido no primeiro uso, depois de um eventual monkey patch
+        try:
+            from gevent import get_hub, monkey
+            if monkey.is_module_patched('threading'):
+                self._slots = threading.BoundedSemaphore(self._max_concurrency)
+                self._runner = lambda fn, *args: get_hub().threadpool.apply(fn, args)
+                return
+        except ImportError:
+            pass
+
+        try:
+            from eventlet import tpool
+            from eventlet.semaphore import BoundedSemaphore
+            self._slots = BoundedSemaphore(self._max_concurrency)
+            self._runner = tpool.execute
+            return
+        except ImportError:
+            pass
+
+        executor = ThreadPoolExecutor(
+            max_workers=self._max_concurrency,
+            thread_name_prefix=self.name
+        )
+        self._slots = threading.BoundedSemaphore(self._max_concurrency)
+        self._runner = lambda fn, *args: executor.submit(fn, *args).result()
+
+    def run(self, fn, *args):
+        if self._runner is None:
+            self._setup()
+
+        start = time.perf_counter()
+        with self._slots:
+            Metrics.observe(f"{self.name}.wait", time.perf_counter() - start)
+            with Metrics.timer(f"{self.name}.run"):
+                return self._runner(fn, *args)
@@ -1,3 +1,4 @@
+import threading
 import mysql.connector
 from mysql.connector import pooling, Error
 from urllib.parse import urlparse
@@ -7,6 +8,9 @@ from app.config import Config
 # Variável global para o pool de conexões
 connection_pool = None
 
+# Conexão fixada pelo greenlet/thread atual (ver pinned_connection)
+_pinned = threading.local()
+
 def init_connection_pool():
     """Inicializa o pool de conexões com o banco de dados"""
     global connection_pool
@@ -102,7 +106,8 @@ def get_db_cursor(dictionary=True):
             cursor.execute("SELECT * FROM users")
             results = cursor.fetchall()
     """
-    conn = get_db()
+    pinned = getattr(_pinned, 'conn', None)
+    conn = pinned or get_db()
     cursor = conn.cursor(dictionary=dictionary)
     try:
         yield cursor
@@ -113,11 +118,44 @@ def get_db_cursor(dictionary=True):
         raise e
     finally:
         cursor.close()
+        if pinned is None:
+            conn.close()
+
+@contextmanager
+def pinned_connection():
+    """
+    Fixa uma única conexão do pool para todas as queries do bloco
+
+    Dentro do bloco, `get_db_cursor` (e portanto todo o Database) reutiliza
+    a mesma conexão em vez de pegar e devolver uma ao pool por query. Cada
+    query continua com seu próprio commit. Reentrante: um bloco aninhado
+    usa a conexão já fixada.
+
+    Usage:
+        with pinned_connection():
+            user = UserRepository.find_by_id(1)
+            contacts = ContactRepository.find_all_by_user(1)
+    """
+    if getattr(_pinned, 'conn', None) is not None:
+        yield _pinned.conn
+        return
+
+    conn = get_db()
+    _pinned.conn = conn
+    try:
+        yield conn
+    finally:
+        _pinned.conn = None
         conn.close()
 
 class Database:
     """Classe para gerenciar operações com o banco de dados"""
     
+    @staticmethod
+    def pinned():
+        """Atalho para `pinned_connection()`"""
+        return pinned_connection()
+    
     @staticmethod
     def execute_query(query, params=None, fetch=False, fetch_one=False):
         """
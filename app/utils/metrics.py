@@ -0,0 +1,69 @@
+import time
+import threading
+from contextlib import contextmanager
+
+
+class Metrics:
+    """
+    Registro simples de métricas em memória (contadores, gauges e tempos)
+    """
+
+    _lock = threading.Lock()
+    _counters = {}
+    _gauges = {}
+    _timers = {}
+
+    @staticmethod
+    def incr(name, value=1):
+        with Metrics._lock:
+            Metrics._counters[name] = Metrics._counters.get(name, 0) + value
+
+    @staticmethod
+    def gauge(name, value):
+        with Metrics._lock:
+            Metrics._gauges[name] = value
+
+    @staticmethod
+    def observe(name, seconds):
+        """Registra a duração de uma operação"""
+        with Metrics._lock:
+            timer = Metrics._timers.get(name)
+            if timer is None:
+                timer = Metrics._timers[name] = {'count': 0, 'total': 0.0, 'max': 0.0}
+            timer['count'] += 1
+            timer['total'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+
+    @staticmethod
+    @contextmanager
+    def timer(name):
+        """
+        Context manager que mede o bloco e registra em `name`
+
+        Usage:
+            with Metrics.timer('pipeline.persist'):
+                MessageRepository.create(message)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            Metrics.observe(name, time.perf_counter() - start)
+
+    @staticmethod
+    def snapshot():
+        """Retorna todas as métricas em formato serializável"""
+        with Metrics._lock:
+            timers = {
+                name: {
+                    'count': t['count'],
+                    'avg_ms': round(t['total'] / t['count'] * 1000, 3) if t['count'] else 0,
+                    'max_ms': round(t['max'] * 1000, 3)
+                }
+                for name, t in Metrics._timers.items()
+            }
+            return {
+                'counters': dict(Metrics._counters),
+                'gauges': dict(Metrics._gauges),
+                'timers': timers
+            }
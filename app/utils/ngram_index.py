@@ -0,0 +1,153 @@
+import heapq
+import threading
+
+
+class NGramIndex:
+    """
+    Índice invertido de n-gramas para busca por substring
+
+    Equivale a `name LIKE '%termo%' OR email LIKE '%termo%'` sem varrer a
+    tabela. Os resultados saem ranqueados:
+
+        0. email igual ao termo
+        1. email começa com o termo
+        2. nome começa com o termo
+        3. alguma palavra do nome começa com o termo
+        4. contém o termo
+
+    Os ranks 0-3 vêm de um índice de prefixos (`^` + 2/3 primeiros
+    caracteres de cada palavra e do email), que é pequeno mesmo para termos
+    comuns. Só se faltarem resultados o índice de bigramas/trigramas é
+    usado para completar com ocorrências no meio do texto, parando assim
+    que `limit` é atingido. O custo não depende do total de documentos,
+    e sim de quantos começam com o termo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # doc_id -> (name, email, name_lower, email_lower)
+        self._docs = {}
+        # n-grama -> {doc_id}
+        self._postings = {}
+
+    @staticmethod
+    def _grams(text):
+        grams = set()
+        for n in (2, 3):
+            for i in range(len(text) - n + 1):
+                grams.add(text[i:i + n])
+        return grams
+
+    @staticmethod
+    def _prefix_key(word):
+        return '^' + word[:3]
+
+    def _doc_grams(self, doc):
+        _, _, name_lower, email_lower = doc
+        grams = self._grams(name_lower) | self._grams(email_lower)
+        for word in name_lower.split() + [email_lower]:
+            if len(word) >= 2:
+                grams.add('^' + word[:2])
+                grams.add(self._prefix_key(word))
+        return grams
+
+    def add(self, doc_id, name, email):
+        """Indexa (ou reindexa) um documento"""
+        doc = (name or '', email or '', (name or '').lower(), (email or '').lower())
+
+        with self._lock:
+            self._remove_locked(doc_id)
+            self._docs[doc_id] = doc
+            for gram in self._doc_grams(doc):
+                self._postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+
+        for gram in self._doc_grams(doc):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def get(self, doc_id):
+        doc = self._docs.get(doc_id)
+        return (doc[0], doc[1]) if doc else None
+
+    @staticmethod
+    def _rank(term, doc):
+        _, _, name_lower, email_lower = doc
+
+        if email_lower == term:
+            return 0
+        if email_lower.startswith(term):
+            return 1
+        if name_lower.startswith(term):
+            return 2
+        if any(word.startswith(term) for word in name_lower.split()):
+            return 3
+        if term in name_lower or term in email_lower:
+            return 4
+        return None
+
+    def search(self, term, limit=20, exclude=()):
+        """
+        Returns:
+            list: Até `limit` tuplas (doc_id, name, email), melhores primeiro
+        """
+        term = (term or '').strip().lower()
+        if len(term) < 2:
+            return []
+
+        with self._lock:
+            # 1) Começa com o termo (ranks 0-3)
+            ranked = []
+            for doc_id in self._postings.get(self._prefix_key(term), ()):
+                if doc_id in exclude:
+                    continue
+                doc = self._docs[doc_id]
+                rank = self._rank(term, doc)
+                if rank is not None and rank < 4:
+                    ranked.append((rank, len(doc[0]), doc[2], doc_id))
+
+            found = [doc_id for *_, doc_id in heapq.nsmallest(limit, ranked)]
+
+            # 2) Completa com quem contém o termo no meio
+            if len(found) < limit:
+                found.extend(self._contains(term, limit - len(found), exclude, set(found)))
+
+            return [(doc_id, self._docs[doc_id][0], self._docs[doc_id][1]) for doc_id in found]
+
+    def _contains(self, term, limit, exclude, seen):
+        n = min(len(term), 3)
+        postings = []
+        for i in range(len(term) - n + 1):
+            ids = self._postings.get(term[i:i + n])
+            if not ids:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+
+        found = []
+        for doc_id in postings[0]:
+            if doc_id in exclude or doc_id in seen:
+                continue
+            if any(doc_id not in ids for ids in postings[1:]):
+                continue
+
+            _, _, name_lower, email_lower = self._docs[doc_id]
+            if term in name_lower or term in email_lower:
+                found.append(doc_id)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def __len__(self):
+        return len(self._docs)
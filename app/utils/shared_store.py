@@ -0,0 +1,285 @@
+import time
+import threading
+from collections import deque
+from app.config import Config
+
+
+class InMemoryStore:
+    """
+    Armazenamento compartilhado local (um único processo)
+
+    Implementa o mesmo subconjunto de operações do RedisStore e é usado
+    quando SHARED_STORE_URL não está configurada (ou em testes).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._sets = {}
+        self._hashes = {}
+        self._lists = {}
+        # key -> {member: epoch de expiração}
+        self._leases = {}
+        # key -> epoch de expiração (hashes e listas)
+        self._expires = {}
+
+    # ---------- valores simples ----------
+
+    def get(self, key):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._values[key]
+                return None
+            return value
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl if ttl else None)
+
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._values.get(key, (0, None))
+            value = int(value) + 1
+            self._values[key] = (value, expires_at)
+            return value
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+                self._sets.pop(key, None)
+                self._hashes.pop(key, None)
+                self._lists.pop(key, None)
+                self._leases.pop(key, None)
+                self._expires.pop(key, None)
+
+    def _expired(self, key):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at < time.time():
+            self._hashes.pop(key, None)
+            self._lists.pop(key, None)
+            self._expires.pop(key, None)
+            return True
+        return False
+
+    def expire(self, key, ttl):
+        with self._lock:
+            if key in self._hashes or key in self._lists:
+                self._expires[key] = time.time() + ttl
+
+    # ---------- conjuntos ----------
+
+    def sadd(self, key, member):
+        with self._lock:
+            members = self._sets.setdefault(key, set())
+            before = len(members)
+            members.add(member)
+            return len(members) - before
+
+    def srem(self, key, member):
+        with self._lock:
+            members = self._sets.get(key)
+            if not members or member not in members:
+                return 0
+            members.discard(member)
+            if not members:
+                del self._sets[key]
+            return 1
+
+    def smembers(self, key):
+        with self._lock:
+            return set(self._sets.get(key, ()))
+
+    def scard(self, key):
+        with self._lock:
+            return len(self._sets.get(key, ()))
+
+    # ---------- hashes ----------
+
+    def hset(self, key, mapping, ttl=None):
+        with self._lock:
+            self._expired(key)
+            self._hashes.setdefault(key, {}).update(mapping)
+            if ttl:
+                self._expires[key] = time.time() + ttl
+
+    def hgetall(self, key):
+        with self._lock:
+            self._expired(key)
+            return dict(self._hashes.get(key, {}))
+
+    # ---------- conjuntos com expiração por membro ----------
+
+    def _live_leases(self, key, now):
+        leases = self._leases.get(key)
+        if leases:
+            for member in [m for m, expires_at in leases.items() if expires_at <= now]:
+                del leases[member]
+            if not leases:
+                del self._leases[key]
+                return None
+        return leases
+
+    def lease_add(self, key, member, ttl):
+        """Adiciona/renova `member` por `ttl` segundos; devolve quantos membros vivos há"""
+        now = time.time()
+        with self._lock:
+            leases = self._live_leases(key, now)
+            if leases is None:
+                leases = self._leases[key] = {}
+            leases[member] = now + ttl
+            return len(leases)
+
+    def lease_remove(self, key, member):
+        """Remove `member`; devolve quantos membros vivos restam"""
+        with self._lock:
+            leases = self._leases.get(key)
+            if leases:
+                leases.pop(member, None)
+            leases = self._live_leases(key, time.time())
+            return len(leases) if leases else 0
+
+    def lease_members(self, key):
+        with self._lock:
+            return set(self._live_leases(key, time.time()) or ())
+
+    def lease_count(self, key):
+        with self._lock:
+            return len(self._live_leases(key, time.time()) or ())
+
+    # ---------- listas ----------
+
+    def _live_list(self, key):
+        self._expired(key)
+        return self._lists.get(key)
+
+    def rpush(self, key, value, maxlen=None, ttl=None):
+        """Adiciona ao fim; com maxlen mantém só os últimos itens"""
+        with self._lock:
+            items = self._live_list(key)
+            if items is None or items.maxlen != maxlen:
+                items = self._lists[key] = deque(items or (), maxlen=maxlen)
+            items.append(value)
+            if ttl:
+                self._expires[key] = time.time() + ttl
+            return len(items)
+
+    def lrange(self, key, start=0, stop=-1):
+        with self._lock:
+            items = list(self._live_list(key) or ())
+        stop = len(items) if stop == -1 else stop + 1
+        return items[start:stop]
+
+
+class RedisStore:
+    """
+    Armazenamento compartilhado entre workers/nós via Redis (ou compatível)
+
+    Valores de conjuntos e hashes são devolvidos como str.
+    """
+
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key):
+        return self._redis.get(key)
+
+    def mget(self, keys):
+        return self._redis.mget(keys) if keys else []
+
+    def set(self, key, value, ttl=None):
+        self._redis.set(key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, *keys):
+        if keys:
+            self._redis.delete(*keys)
+
+    def sadd(self, key, member):
+        return self._redis.sadd(key, member)
+
+    def srem(self, key, member):
+        return self._redis.srem(key, member)
+
+    def smembers(self, key):
+        return self._redis.smembers(key)
+
+    def scard(self, key):
+        return self._redis.scard(key)
+
+    def hset(self, key, mapping, ttl=None):
+        pipe = self._redis.pipeline()
+        pipe.hset(key, mapping={k: '' if v is None else v for k, v in mapping.items()})
+        if ttl:
+            pipe.expire(key, int(ttl))
+        pipe.execute()
+
+    def hgetall(self, key):
+        return self._redis.hgetall(key)
+
+    def expire(self, key, ttl):
+        self._redis.expire(key, int(ttl))
+
+    # Conjuntos com expiração por membro: sorted set com score = expiração.
+    # Os pipelines rodam em MULTI/EXEC, então a contagem devolvida é atômica
+    # com a alteração.
+
+    def lease_add(self, key, member, ttl):
+        now = time.time()
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(key, '-inf', now)
+        pipe.zadd(key, {member: now + ttl})
+        pipe.zcard(key)
+        pipe.expire(key, int(ttl) + 1)
+        return pipe.execute()[2]
+
+    def lease_remove(self, key, member):
+        pipe = self._redis.pipeline()
+        pipe.zrem(key, member)
+        pipe.zremrangebyscore(key, '-inf', time.time())
+        pipe.zcard(key)
+        return pipe.execute()[2]
+
+    def lease_members(self, key):
+        return set(self._redis.zrangebyscore(key, time.time(), '+inf'))
+
+    def lease_count(self, key):
+        return self._redis.zcount(key, time.time(), '+inf')
+
+    def incr(self, key):
+        return self._redis.incr(key)
+
+    def rpush(self, key, value, maxlen=None, ttl=None):
+        pipe = self._redis.pipeline()
+        pipe.rpush(key, value)
+        if maxlen:
+            pipe.ltrim(key, -maxlen, -1)
+        if ttl:
+            pipe.expire(key, int(ttl))
+        return pipe.execute()[0]
+
+    def lrange(self, key, start=0, stop=-1):
+        return self._redis.lrange(key, start, stop)
+
+
+_store = None
+
+def get_shared_store():
+    """Retorna o armazenamento configurado (Redis se SHARED_STORE_URL existir)"""
+    global _store
+
+    if _store is None:
+        if Config.SHARED_STORE_URL:
+            _store = RedisStore(Config.SHARED_STORE_URL)
+            print("✅ Estado compartilhado em Redis")
+        else:
+            _store = InMemoryStore()
+
+    return _store
@@ -0,0 +1,121 @@
+import math
+import time
+
+
+class TimerWheel:
+    """
+    Timing wheel hierárquico
+
+    Cada nível tem `slots` posições; a posição de um nível cobre `slots`
+    posições do nível abaixo. Timers distantes ficam nos níveis altos e
+    descem (cascade) conforme o prazo se aproxima, então cada `advance`
+    custa O(1) amortizado por tick, independente de quantos timers existem.
+
+    Args:
+        tick (float): Resolução em segundos
+        slots (int): Posições por nível
+        levels (int): Número de níveis (horizonte = tick * slots ** levels)
+        now (float): Tempo inicial (padrão: time.time())
+
+    Usage:
+        wheel = TimerWheel(tick=1.0)
+        wheel.schedule('msg:1', time.time() + 30, payload)
+        for key, payload in wheel.advance(time.time()):
+            ...
+    """
+
+    def __init__(self, tick=1.0, slots=64, levels=3, now=None):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        # key -> (deadline_tick, payload, level, slot)
+        self._timers = {}
+        self._current = int((time.time() if now is None else now) // tick)
+
+    @property
+    def horizon(self):
+        """Maior atraso (em segundos) aceito por `schedule`"""
+        return self.tick * self.slots ** self.levels
+
+    def schedule(self, key, deadline, payload=None):
+        """
+        Agenda (ou reagenda) `key` para `deadline` (epoch em segundos)
+
+        Returns:
+            bool: False se o prazo estiver além do horizonte da roda
+        """
+        self.cancel(key)
+
+        deadline_tick = max(math.ceil(deadline / self.tick), self._current + 1)
+        return self._place(key, deadline_tick, payload)
+
+    def cancel(self, key):
+        entry = self._timers.pop(key, None)
+        if entry is None:
+            return False
+
+        _, _, level, slot = entry
+        self._wheels[level][slot].pop(key, None)
+        return True
+
+    def advance(self, now):
+        """
+        Avança a roda até `now` e retorna os timers vencidos
+
+        Returns:
+            list: Tuplas (key, payload) em ordem de vencimento
+        """
+        target = int(now // self.tick)
+        expired = []
+
+        while self._current < target:
+            self._current += 1
+            self._cascade(expired)
+
+            bucket = self._wheels[0][self._current % self.slots]
+            if bucket:
+                self._wheels[0][self._current % self.slots] = {}
+                for key in bucket:
+                    _, payload, _, _ = self._timers.pop(key)
+                    expired.append((key, payload))
+
+        return expired
+
+    def _place(self, key, deadline_tick, payload):
+        delta = deadline_tick - self._current
+
+        for level in range(self.levels):
+            if delta < self.slots ** (level + 1):
+                slot = (deadline_tick // self.slots ** level) % self.slots
+                self._wheels[level][slot][key] = deadline_tick
+                self._timers[key] = (deadline_tick, payload, level, slot)
+                return True
+
+        return False
+
+    def _cascade(self, expired):
+        """Redistribui nos níveis baixos os timers do bloco que começa agora"""
+        for level in range(1, self.levels):
+            span = self.slots ** level
+            if self._current % span:
+                break
+
+            slot = (self._current // span) % self.slots
+            bucket = self._wheels[level][slot]
+            if not bucket:
+                continue
+
+            self._wheels[level][slot] = {}
+            for key, deadline_tick in bucket.items():
+                _, payload, _, _ = self._timers.pop(key)
+                if deadline_tick <= self._current:
+                    expired.append((key, payload))
+                else:
+                    self._place(key, deadline_tick, payload)
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.metrics import Metrics
+
+
+class WorkerPool:
+    """
+    Pool de workers com fila limitada
+
+    Quando a fila enche, a tarefa roda no próprio chamador em vez de ser
+    descartada, o que freia naturalmente quem está produzindo trabalho.
+
+    Args:
+        name (str): Nome do pool (prefixo das métricas e das threads)
+        max_workers (int): Número de workers
+        max_pending (int): Máximo de tarefas enfileiradas/em execução
+    """
+
+    def __init__(self, name, max_workers=4, max_pending=1000):
+        self.name = name
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=name
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            Metrics.incr(f"{self.name}.inline")
+            self._run(fn, args, kwargs)
+            return
+
+        with self._lock:
+            self._pending += 1
+            Metrics.gauge(f"{self.name}.pending", self._pending)
+
+        self._executor.submit(self._run_slot, fn, args, kwargs)
+
+    def _run_slot(self, fn, args, kwargs):
+        try:
+            self._run(fn, args, kwargs)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                Metrics.gauge(f"{self.name}.pending", self._pending)
+            self._slots.release()
+
+    def _run(self, fn, args, kwargs):
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            Metrics.incr(f"{self.name}.errors")
+            print(f"❌ Erro em tarefa do pool {self.name}: {e}")
+            import traceback
+            traceback.print_exc()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,76 @@
+"""
+Benchmark de latência do loop de eventos durante logins (bcrypt)
+
+Um greenlet "socket" acorda a cada --tick ms e mede o atraso em relação
+ao horário esperado, enquanto --logins verificações de senha rodam em
+paralelo. Compara bcrypt inline no hub (comportamento antigo) com o
+BlockingPool usado pelo AuthService.
+
+Usage:
+    python -m benchmarks.bcrypt_offload --logins 20 --rounds 12
+"""
+
+import eventlet
+eventlet.monkey_patch()
+
+import argparse
+import statistics
+import time
+
+import bcrypt
+
+
+def _ticker(tick, lags, stop):
+    expected = time.perf_counter() + tick
+    while not stop:
+        eventlet.sleep(tick)
+        now = time.perf_counter()
+        lags.append(max(now - expected, 0.0))
+        expected = now + tick
+
+
+def _run(mode, verify, logins, tick):
+    lags = []
+    stop = []
+    ticker = eventlet.spawn(_ticker, tick, lags, stop)
+    eventlet.sleep(tick * 5)
+
+    start = time.perf_counter()
+    pool = eventlet.GreenPool(logins)
+    for _ in range(logins):
+        pool.spawn(verify)
+    pool.waitall()
+    elapsed = time.perf_counter() - start
+
+    stop.append(True)
+    ticker.wait()
+
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[int(len(lags_ms) * 0.99) - 1] if lags_ms else 0.0
+    print(
+        f"{mode:<8} {logins} logins em {elapsed:6.2f}s | atraso do loop: "
+        f"p50 {statistics.median(lags_ms):7.2f} ms  p99 {p99:7.2f} ms  max {lags_ms[-1]:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--tick', type=float, default=10, help='intervalo do ticker (ms)')
+    args = parser.parse_args()
+
+    from app.utils.blocking_pool import BlockingPool
+
+    password = b'senha-de-teste'
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=args.rounds))
+    pool = BlockingPool('bench.bcrypt', max_concurrency=args.concurrency)
+    tick = args.tick / 1000
+
+    _run('inline', lambda: bcrypt.checkpw(password, hashed), args.logins, tick)
+    _run('pool', lambda: pool.run(bcrypt.checkpw, password, hashed), args.logins, tick)
+
+
+if __name__ == '__main__':
+    main()
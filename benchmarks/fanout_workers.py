@@ -0,0 +1,169 @@
+"""
+Benchmark de fan-out com vários workers
+
+Cada worker é um processo com o próprio `socketio.Server` ligado ao
+gerenciador de fila de mensagens, como em produção com
+SOCKETIO_MESSAGE_QUEUE: os usuários ficam conectados a workers
+diferentes e cada mensagem enviada num worker sai por `server.emit` para
+a sala pessoal do destinatário, passa pelo broker e é entregue pelo
+worker onde ele está conectado. A presença do destinatário é consultada
+antes no SessionRegistry, como no envio de verdade.
+
+Com SOCKETIO_MESSAGE_QUEUE definido usa `socketio.RedisManager` no
+broker real (canal próprio, não interfere com o app); sem ele usa um
+stand-in local do mesmo gerenciador pub/sub sobre filas do
+multiprocessing. As sessões usam o RedisStore com SHARED_STORE_URL e o
+InMemoryStore (por processo) sem ele.
+
+A entrega termina no Engine.IO: o pacote Socket.IO é codificado e o
+envio para o transporte só é contado, sem socket de rede.
+
+Usage:
+    python -m benchmarks.fanout_workers --messages 20000 --workers 1 2 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+
+import socketio
+
+CHANNEL = 'mychat-benchmark'
+
+
+class LocalQueueManager(socketio.PubSubManager):
+    """Stand-in do broker: cada worker tem uma fila e publicar copia para todas"""
+
+    name = 'local-queue'
+
+    def __init__(self, worker_id, queues, write_only=False, logger=None):
+        super().__init__(channel=CHANNEL, write_only=write_only, logger=logger)
+        self.worker_id = worker_id
+        self.queues = queues
+
+    def _publish(self, data):
+        for i, queue in enumerate(self.queues):
+            if i != self.worker_id:
+                queue.put(data)
+
+    def _listen(self):
+        while True:
+            yield self.queues[self.worker_id].get()
+
+
+def _receiver_of(i, users):
+    # Espalha os destinatários entre os workers
+    return (i * 7919) % users
+
+
+def _worker(worker_id, workers, messages, users, queues, barrier, results):
+    from app.config import Config
+    from app.sockets.session_registry import SessionRegistry
+    from app.utils.shared_store import InMemoryStore, RedisStore
+
+    if Config.SOCKETIO_MESSAGE_QUEUE:
+        manager = socketio.RedisManager(Config.SOCKETIO_MESSAGE_QUEUE, channel=CHANNEL)
+    else:
+        manager = LocalQueueManager(worker_id, queues)
+    store = RedisStore(Config.SHARED_STORE_URL) if Config.SHARED_STORE_URL else InMemoryStore()
+
+    server = socketio.Server(client_manager=manager, async_mode='threading')
+    registry = SessionRegistry(store)
+
+    # Entregas que chegam ao Engine.IO (pacote já codificado)
+    expected = sum(1 for i in range(messages) if _receiver_of(i, users) % workers == worker_id)
+    delivered = [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def send_packet(eio_sid, eio_packet):
+        with lock:
+            delivered[0] += 1
+            if delivered[0] >= expected:
+                done.set()
+
+    server.eio.send_packet = send_packet
+    if expected == 0:
+        done.set()
+
+    # Usuários deste worker conectados na sala pessoal
+    for user_id in range(worker_id, users, workers):
+        eio_sid = f"w{worker_id}-eio{user_id}"
+        sid = server.manager.connect(eio_sid, '/')
+        server.enter_room(sid, f"user_{user_id}")
+        registry.add(sid, user_id, f"User {user_id}")
+
+    server.manager.initialize()
+
+    # Todos os workers começam juntos, depois de conectar e assinar o canal
+    barrier.wait()
+    start = time.time()
+    for i in range(worker_id, messages, workers):
+        receiver_id = _receiver_of(i, users)
+        message_data = {
+            'id': i,
+            'sender_id': (i + 1) % users,
+            'receiver_id': receiver_id,
+            'content': 'Olá, tudo bem?',
+            'is_read': False,
+            'created_at': '2024-01-01T12:00:00',
+            'sender_name': f"User {(i + 1) % users}",
+            'temp_id': f"temp_{i}"
+        }
+        # A sala pessoal recebe de qualquer jeito; a consulta decide o push
+        registry.is_online(receiver_id)
+        server.emit('new_message', message_data, room=f"user_{receiver_id}")
+
+    if not done.wait(timeout=120):
+        print(f"⚠️ worker {worker_id}: {delivered[0]}/{expected} entregas")
+    results.put((start, time.time()))
+
+
+def run(workers, messages, users):
+    results = multiprocessing.Queue()
+    barrier = multiprocessing.Barrier(workers)
+    queues = [multiprocessing.Queue() for _ in range(workers)]
+    processes = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(i, workers, messages, users, queues, barrier, results),
+            daemon=True
+        )
+        for i in range(workers)
+    ]
+
+    for process in processes:
+        process.start()
+    spans = [results.get() for _ in processes]
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+    elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+    return messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    from app.config import Config
+
+    broker = Config.SOCKETIO_MESSAGE_QUEUE or 'stand-in local'
+    print(f"CPUs: {os.cpu_count()}  mensagens: {args.messages}  usuários: {args.users}  broker: {broker}")
+    baseline = None
+    for workers in args.workers:
+        throughput = run(workers, args.messages, args.users)
+        baseline = baseline or throughput / workers
+        print(f"workers={workers:<3} {throughput:>10.0f} msg/s  "
+              f"(escala {throughput / baseline:.2f}x de {workers}x ideal)")
+
+
+if __name__ == '__main__':
+    main()
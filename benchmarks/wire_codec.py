@@ -0,0 +1,102 @@
+"""
+Benchmark do formato de fio: JSON x MessagePack (com e sem chaves curtas)
+
+Mede custo de codificação/decodificação e tamanho do frame para os
+payloads mais frequentes do servidor (new_message, message_notification,
+lote de message_status_update e presence_diff). O JSON é medido com o
+mesmo `json.dumps` compacto que o python-socketio usa.
+
+Usage:
+    python -m benchmarks.wire_codec --iterations 50000
+"""
+
+import argparse
+import json
+import time
+
+
+def _payloads():
+    message = {
+        'id': 123456,
+        'sender_id': 42,
+        'receiver_id': 1337,
+        'content': 'Olá! Tudo certo para amanhã às 10h?',
+        'is_read': False,
+        'created_at': '2024-01-01T12:00:00',
+        'sender_name': 'Maria Silva',
+        'temp_id': 'temp_1704110400000',
+        'seq': 981
+    }
+    return {
+        'new_message': message,
+        'message_notification': {
+            'message': message,
+            'from_user': {'id': 42, 'name': 'Maria Silva'}
+        },
+        'batch (10 status)': {
+            'events': [
+                {
+                    'event': 'message_status_update',
+                    'data': {'message_id': 123000 + i, 'status': 'delivered', 'seq': 900 + i}
+                }
+                for i in range(10)
+            ]
+        },
+        'presence_diff (50)': {
+            'online': [{'user_id': i, 'name': f"Contato {i}"} for i in range(25)],
+            'offline': [{'user_id': 100 + i, 'last_seen': 1704110400.5 + i} for i in range(25)]
+        }
+    }
+
+
+def _measure(encode, decode, payload, iterations):
+    frame = encode(payload)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encode(payload)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(frame)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return len(frame), encode_us, decode_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=50000)
+    args = parser.parse_args()
+
+    import msgpack
+    from app.sockets.codec import WireCodec
+
+    codecs = {
+        'json': (
+            lambda data: json.dumps(data, separators=(',', ':')).encode(),
+            json.loads
+        ),
+        'msgpack': (
+            lambda data: msgpack.packb(data, use_bin_type=True),
+            lambda frame: msgpack.unpackb(frame, raw=False)
+        ),
+        'msgpack+codes': (WireCodec.pack, WireCodec.unpack),
+    }
+
+    print(f"{'payload':<22} {'codec':<14} {'bytes':>7} {'enc µs':>8} {'dec µs':>8}")
+    for name, payload in _payloads().items():
+        baseline = None
+        for codec, (encode, decode) in codecs.items():
+            size, encode_us, decode_us = _measure(encode, decode, payload, args.iterations)
+            baseline = baseline or size
+            print(
+                f"{name:<22} {codec:<14} {size:>7} {encode_us:>8.2f} {decode_us:>8.2f}"
+                f"  ({size / baseline:.0%} do JSON)"
+            )
+        print()
+
+
+if __name__ == '__main__':
+    main()
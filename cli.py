@@ -0,0 +1,4 @@
+from app import create_cli_app
+
+# Comandos `flask --app cli <comando>` sem subir os serviços do servidor
+app = create_cli_app()
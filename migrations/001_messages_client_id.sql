@@ -0,0 +1,4 @@
+-- Idempotência de envio: chave do cliente (temp_id / Idempotency-Key)
+ALTER TABLE messages
+    ADD COLUMN client_id VARCHAR(64) NULL AFTER content,
+    ADD UNIQUE KEY uq_messages_sender_client (sender_id, client_id);
@@ -0,0 +1,24 @@
+-- Recibos de entrega persistidos
+ALTER TABLE messages
+    ADD COLUMN delivered_at DATETIME NULL AFTER is_read;
+
+-- A procedure passa a devolver delivered_at/client_id (m.*) junto com os nomes
+DROP PROCEDURE IF EXISTS get_conversation_messages;
+DELIMITER //
+CREATE PROCEDURE get_conversation_messages(IN p_user1 INT, IN p_user2 INT, IN p_limit INT)
+BEGIN
+    SELECT
+        m.*,
+        u1.name AS sender_name,
+        u2.name AS receiver_name
+    FROM messages m
+    JOIN users u1 ON m.sender_id = u1.id
+    JOIN users u2 ON m.receiver_id = u2.id
+    WHERE
+        (m.sender_id = p_user1 AND m.receiver_id = p_user2)
+        OR
+        (m.sender_id = p_user2 AND m.receiver_id = p_user1)
+    ORDER BY m.created_at DESC
+    LIMIT p_limit;
+END //
+DELIMITER ;
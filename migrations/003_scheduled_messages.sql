@@ -0,0 +1,15 @@
+-- Mensagens agendadas (despachadas pelo ScheduleService)
+CREATE TABLE scheduled_messages (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    sender_id INT NOT NULL,
+    receiver_id INT NOT NULL,
+    content TEXT NOT NULL,
+    send_at DATETIME NOT NULL,
+    status ENUM('pending', 'sent', 'failed', 'canceled') NOT NULL DEFAULT 'pending',
+    message_id INT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (sender_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (receiver_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_scheduled_status_send_at (status, send_at),
+    INDEX idx_scheduled_sender_status (sender_id, status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
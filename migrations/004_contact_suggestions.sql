@@ -0,0 +1,12 @@
+-- Sugestões de contato por contatos em comum (gravadas por `flask compute-suggestions`)
+CREATE TABLE contact_suggestions (
+    user_id INT NOT NULL,
+    suggested_user_id INT NOT NULL,
+    mutual_count SMALLINT UNSIGNED NOT NULL,
+    computed_at DATETIME NOT NULL,
+    PRIMARY KEY (user_id, suggested_user_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (suggested_user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_suggestions_user_mutual (user_id, mutual_count),
+    INDEX idx_suggestions_computed_at (computed_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
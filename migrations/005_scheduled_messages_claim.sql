@@ -0,0 +1,6 @@
+-- Despacho com reivindicação atômica ('sending') e idempotência do agendamento
+ALTER TABLE scheduled_messages
+    MODIFY COLUMN status ENUM('pending', 'sending', 'sent', 'failed', 'canceled') NOT NULL DEFAULT 'pending',
+    ADD COLUMN client_id VARCHAR(64) NULL AFTER content,
+    ADD COLUMN claimed_at DATETIME NULL AFTER status,
+    ADD UNIQUE KEY uq_scheduled_sender_client (sender_id, client_id);